@@ -1,39 +1,141 @@
 from flask import Flask, request, jsonify, session
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
+import ahocorasick
 import argparse
+import functools
+import itertools
 import logging
+import orjson
+import re
+import string
 import threading
-from datetime import datetime
-from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import LRUCache, TTLCache
 from dotenv import load_dotenv
-from src.gmail_client import send_email
-from src.auth import request_login_code, verify_login_code, get_user_by_email
-from src.db import get_db_connection
+from src.auth import request_login_code, verify_login_code, get_user_by_email, invalidate_user_cache
+from src.db import get_db_connection, execute_prepared
 from src.twilio_client import TwilioClient
-from src.elevenlabs_client import ElevenLabsClient
+from src.elevenlabs_client import ElevenLabsClient, is_conversation_final
+from src.phone_utils import format_phone_number
 
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (set LOG_LEVEL=WARNING in production to drop per-request info logs)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson, used by jsonify() and request.get_json().
+    orjson is much faster than the stdlib json module and serializes datetimes as ISO 8601 natively.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of decoding to str and re-encoding
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 app = Flask(__name__)
-app.secret_key = os.getenv('SECRET_KEY', os.urandom(24).hex())
+app.json = OrjsonProvider(app)
+
+# Number of proxies in front of the app (Render runs one). ProxyFix trusts only that many
+# X-Forwarded-For entries, so request.remote_addr is the real client and can't be spoofed
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', '1'))
+if TRUSTED_PROXY_COUNT:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_COUNT)
+app.secret_key = os.getenv('SECRET_KEY')
+if not app.secret_key and __name__ != '__main__':
+    # Every gunicorn worker would generate its own random key and reject the others' session cookies
+    raise RuntimeError("SECRET_KEY must be set; only 'python app.py --local' falls back to a random key")
 
 # Configure CORS to allow requests from any origin when deployed (for GitHub Pages)
-# Use simpler configuration that Flask-CORS handles automatically
-CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=False)
+# Browsers cache the preflight response for max_age seconds, saving an OPTIONS round-trip per request
+CORS(app, resources={r"/api/*": {
+    "origins": "*",
+    "methods": ["GET", "POST", "OPTIONS"],
+    "allow_headers": ["Content-Type"],
+    "max_age": 86400
+}}, supports_credentials=False)
+
+# Compress JSON responses (the conversations payload shrinks several times over)
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_LEVEL'] = 4
+app.config['COMPRESS_MIN_SIZE'] = 500
+Compress(app)
+
+# Small fixed pool of long-lived workers that send notification emails in the background.
+# Requests just enqueue the send; the pool bounds how many sends run at once, which keeps
+# bursts of signups under provider rate limits (SMTP sends share one connection regardless).
+EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', '4'))
+EXECUTOR = ThreadPoolExecutor(max_workers=EMAIL_WORKERS, thread_name_prefix='email')
+
+# Cheap sanity check for sign up emails, compiled once at import
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+MAX_SIGNUP_MESSAGE_LENGTH = 4096
+
+# Per-IP sign up counter: at most SIGNUP_RATE_LIMIT sign ups per client per window
+SIGNUP_RATE_LIMIT = 5
+SIGNUP_RATE_WINDOW_SECONDS = 60
+_signup_counts = TTLCache(maxsize=10000, ttl=SIGNUP_RATE_WINDOW_SECONDS)
+_signup_counts_lock = threading.Lock()
+
+def _signup_rate_limited(client_ip):
+    """Count a sign up attempt for client_ip and return True if it is over the limit"""
+    with _signup_counts_lock:
+        count = _signup_counts.get(client_ip, 0)
+        if count >= SIGNUP_RATE_LIMIT:
+            return True
+        _signup_counts[client_ip] = count + 1
+        return False
+
+# Notification email sent to RECIPIENT_EMAIL for each sign up with a message
+RECIPIENT_EMAIL = os.getenv('RECIPIENT_EMAIL', 'hello@zenbul.com')
+_SIGNUP_SUBJECT_TMPL = "New Journie Sign Up: {}"
+_SIGNUP_BODY_TMPL = string.Template("""New sign up for Journie:
+
+Email: $email
+Name: $first_name $last_name
+
+How/Why they want to use Journie:
+$message
+""")
+
+@functools.lru_cache(maxsize=1)
+def _get_send_email():
+    """Import the email client on first use so process startup and /health don't pay for it"""
+    from src.gmail_client import send_email
+    return send_email
 
 @app.route('/api/signup', methods=['POST'])
 def handle_signup():
-    logger.info(f"POST request received from {request.remote_addr}")
-    logger.info(f"Headers: {dict(request.headers)}")
+    logger.debug("POST request received from %s", request.remote_addr)
+    logger.debug("Headers: %s", request.headers)
+    
+    # remote_addr is the client address as resolved by ProxyFix (see TRUSTED_PROXY_COUNT)
+    client_ip = request.remote_addr
+    if _signup_rate_limited(client_ip):
+        logger.warning(f"Signup rate limit exceeded for {client_ip}")
+        return jsonify({'error': 'Too many sign up attempts. Please try again in a minute.'}), 429
     
     try:
-        data = request.get_json()
-        logger.info(f"Request data: {data}")
+        try:
+            data = orjson.loads(request.get_data(cache=False))
+        except ValueError:
+            logger.warning("Invalid JSON in request body")
+            return jsonify({'error': 'Invalid JSON'}), 400
         
         if not data:
             logger.warning("No data provided in request")
@@ -45,6 +147,9 @@ def handle_signup():
         phone_number = data.get('phone_number', '').strip()
         message = data.get('message', '').strip()
         
+        # Avoid logging the raw payload (PII) - lengths are enough to debug bad requests
+        logger.info("Signup fields: email length=%d, message length=%d", len(email or ''), len(message))
+        
         if not email:
             logger.warning("Missing required field: email")
             return jsonify({'error': 'Email is required'}), 400
@@ -64,53 +169,51 @@ def handle_signup():
         # Normalize email (lowercase)
         email = email.lower().strip()
         
-        logger.info(f"Processing signup for email: {email}")
+        # Reject malformed input before doing any database or email work
+        if not _EMAIL_RE.match(email):
+            logger.warning("Invalid email address in signup")
+            return jsonify({'error': 'Please enter a valid email address'}), 400
         
-        # Check if user already exists
-        try:
-            existing_user = get_user_by_email(email)
-            if existing_user:
-                logger.warning(f"User with email {email} already exists")
-                return jsonify({'error': 'An account with this email already exists. Please log in instead.'}), 400
-        except Exception as e:
-            logger.error(f"Error checking existing user: {str(e)}", exc_info=True)
+        if len(message) > MAX_SIGNUP_MESSAGE_LENGTH:
+            logger.warning(f"Signup message too long ({len(message)} characters)")
+            return jsonify({'error': f'Message must be at most {MAX_SIGNUP_MESSAGE_LENGTH} characters'}), 400
         
-        # Check if phone number is already assigned to another user
-        try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT id, email FROM users 
-                    WHERE phone_number = %s
-                """, (phone_number,))
-                existing_phone_user = cursor.fetchone()
-                cursor.close()
-                
-                if existing_phone_user:
-                    logger.warning(f"Phone number {phone_number} is already assigned to user {existing_phone_user[1]}")
-                    return jsonify({'error': 'This phone number is already registered to another account.'}), 400
-        except Exception as e:
-            logger.error(f"Error checking existing phone number: {str(e)}", exc_info=True)
-            return jsonify({'error': 'Failed to validate phone number. Please try again.'}), 500
+        logger.info(f"Processing signup for email: {email}")
         
-        # Create user in database
+        # Create user in database - the UNIQUE constraints on email and phone_number reject duplicates
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Insert new user
-                cursor.execute("""
+                # Insert new user (returns no row if the email or phone number is already taken)
+                execute_prepared(cursor, 'insert_user', """
                     INSERT INTO users (email, first_name, last_name, phone_number, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    ON CONFLICT DO NOTHING
                     RETURNING id, email, first_name, last_name, phone_number, approved
                 """, (email, first_name, last_name, phone_number))
                 
                 user = cursor.fetchone()
-                cursor.close()
                 
                 if not user:
+                    # Work out which field conflicted so we can return the right message
+                    cursor.execute("""
+                        SELECT email FROM users 
+                        WHERE email = %s OR phone_number = %s
+                    """, (email, phone_number))
+                    conflicting_emails = [row[0] for row in cursor.fetchall()]
+                    cursor.close()
+                    
+                    if email in conflicting_emails:
+                        logger.warning(f"User with email {email} already exists")
+                        return jsonify({'error': 'An account with this email already exists. Please log in instead.'}), 400
+                    if conflicting_emails:
+                        logger.warning(f"Phone number {phone_number} is already assigned to user {conflicting_emails[0]}")
+                        return jsonify({'error': 'This phone number is already registered to another account.'}), 400
                     raise Exception("Failed to create user")
                 
+                cursor.close()
+                
                 user_id, user_email, user_first_name, user_last_name, user_phone_number, user_approved = user
                 
                 # Prepare user data for response
@@ -127,31 +230,24 @@ def handle_signup():
                 session['user_id'] = user_id
                 session['user_email'] = user_email
                 
+                invalidate_user_cache(user_email)
                 logger.info(f"User created successfully: {email}")
                 
                 # Send notification email asynchronously (optional)
                 if message:
-                    recipient = os.getenv('RECIPIENT_EMAIL', 'hello@zenbul.com')
-                    subject = f"New Journie Sign Up: {email}"
-                    body = f"""New sign up for Journie:
-
-Email: {email}
-Name: {first_name} {last_name}
-
-How/Why they want to use Journie:
-{message}
-"""
+                    subject = _SIGNUP_SUBJECT_TMPL.format(email)
+                    body = _SIGNUP_BODY_TMPL.substitute(
+                        email=email, first_name=first_name, last_name=last_name, message=message
+                    )
                     
                     def send_email_async():
                         try:
-                            send_email(recipient, subject, body)
+                            _get_send_email()(RECIPIENT_EMAIL, subject, body)
                             logger.info("Notification email sent successfully")
                         except Exception as e:
                             logger.error(f"Failed to send notification email: {str(e)}", exc_info=True)
                     
-                    email_thread = threading.Thread(target=send_email_async)
-                    email_thread.daemon = True
-                    email_thread.start()
+                    EXECUTOR.submit(send_email_async)
                 
                 # Return user data for automatic login
                 return jsonify({
@@ -161,18 +257,13 @@ How/Why they want to use Journie:
                 }), 200
                 
         except Exception as db_error:
-            # Check if it's a unique constraint violation (duplicate email)
-            error_str = str(db_error).lower()
-            if 'unique' in error_str or 'duplicate' in error_str:
-                logger.warning(f"User with email {email} already exists (database constraint)")
-                return jsonify({'error': 'An account with this email already exists. Please log in instead.'}), 400
-            else:
-                logger.error(f"Database error creating user: {str(db_error)}", exc_info=True)
-                raise
+            logger.error(f"Database error creating user: {str(db_error)}", exc_info=True)
+            raise
     
     except Exception as e:
-        logger.error(f"Failed to submit sign up: {str(e)}", exc_info=True)
-        return jsonify({'error': f'Failed to create account: {str(e)}'}), 500
+        err = str(e)
+        logger.error("Failed to submit sign up: %s", err, exc_info=True)
+        return jsonify({'error': f'Failed to create account: {err}'}), 500
 
 @app.route('/health', methods=['GET'])
 def health():
@@ -203,8 +294,9 @@ def handle_request_login_code():
             return jsonify({'error': message}), 400
             
     except Exception as e:
-        logger.error(f"Failed to request login code: {str(e)}", exc_info=True)
-        return jsonify({'error': f'Failed to request login code: {str(e)}'}), 500
+        err = str(e)
+        logger.error("Failed to request login code: %s", err, exc_info=True)
+        return jsonify({'error': f'Failed to request login code: {err}'}), 500
 
 @app.route('/api/login/verify-code', methods=['POST'])
 def handle_verify_login_code():
@@ -239,8 +331,9 @@ def handle_verify_login_code():
             return jsonify({'error': 'Invalid or expired code'}), 401
             
     except Exception as e:
-        logger.error(f"Failed to verify login code: {str(e)}", exc_info=True)
-        return jsonify({'error': f'Failed to verify login code: {str(e)}'}), 500
+        err = str(e)
+        logger.error("Failed to verify login code: %s", err, exc_info=True)
+        return jsonify({'error': f'Failed to verify login code: {err}'}), 500
 
 @app.route('/api/user/profile', methods=['GET'])
 def handle_get_profile():
@@ -271,34 +364,58 @@ def handle_get_profile():
         return jsonify({'user': user_data}), 200
         
     except Exception as e:
-        logger.error(f"Failed to get profile: {str(e)}", exc_info=True)
-        return jsonify({'error': f'Failed to get profile: {str(e)}'}), 500
-
-def format_phone_number(phone: str) -> str:
-    """Format phone number to E.164 format."""
-    import re
-    # Remove all non-digit characters except +
-    cleaned = re.sub(r'[^\d+]', '', phone)
-    
-    # If it doesn't start with +, assume US number and add +1
-    if not cleaned.startswith('+'):
-        if len(cleaned) == 10:
-            cleaned = '+1' + cleaned
-        elif len(cleaned) == 11 and cleaned[0] == '1':
-            cleaned = '+' + cleaned
-        else:
-            cleaned = '+1' + cleaned
-    
-    return cleaned
+        err = str(e)
+        logger.error("Failed to get profile: %s", err, exc_info=True)
+        return jsonify({'error': f'Failed to get profile: {err}'}), 500
+
+# API clients are created once per process and shared across requests, so their HTTP
+# connection pools (and TLS sessions) are reused instead of rebuilt on every request.
+# Created lazily so the app still starts (and /health works) without Twilio/ElevenLabs credentials.
+@functools.lru_cache(maxsize=1)
+def get_twilio_client():
+    """Shared TwilioClient for this process"""
+    return TwilioClient()
 
-def get_user_conversations_data(user_email: str):
+@functools.lru_cache(maxsize=1)
+def get_elevenlabs_client():
+    """Shared ElevenLabsClient for this process"""
+    return ElevenLabsClient()
+
+# Phone number digits-only cleanup, compiled once
+_PHONE_DIGITS_RE = re.compile(r'[^\d]')
+
+# Concurrent ElevenLabs/Twilio requests when loading a user's conversations
+CONVERSATION_FETCH_WORKERS = 32
+
+# How far back /api/user/conversations looks when no 'since' is given
+CONVERSATIONS_DEFAULT_WINDOW_DAYS = 90
+
+# Attributes probed (in order) for a conversation's start time and duration
+_DATETIME_ATTRS = ('created_at', 'timestamp', 'started_at', 'date_created', 'created', 'start_time', 'updated_at')
+_DURATION_ATTRS = ('duration', 'call_duration', 'length', 'call_length')
+
+def _first_present(d: dict, keys):
+    """Return the value of the first key in keys that is set (truthy) in d, or None."""
+    return next((d[k] for k in keys if d.get(k)), None)
+
+def parse_query_datetime(value: str):
+    """Parse an ISO date/datetime query parameter as an aware UTC datetime (naive values are taken as UTC)."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def get_user_conversations_data(user_email: str, since: datetime = None, until: datetime = None, user_data: dict = None):
     """
     Get conversation data for a user, grouped by day.
     Returns data in format suitable for plotting.
+    Only calls started in the [since, until) window are loaded.
+    Pass user_data if the caller has already loaded the user, to skip the lookup.
     """
     try:
         # Get user data
-        user_data = get_user_by_email(user_email)
+        if user_data is None:
+            user_data = get_user_by_email(user_email)
         if not user_data:
             return None
         
@@ -309,31 +426,35 @@ def get_user_conversations_data(user_email: str):
         # Format phone number
         formatted_phone = format_phone_number(phone_number)
         
-        # Get Twilio call SIDs
-        twilio_client = TwilioClient()
-        call_sids = set()
+        # Get this user's Twilio calls, keyed by SID (kept for the datetime/duration fallback)
+        twilio_client = get_twilio_client()
+        calls_by_sid = {}
+        
+        # stream() pages lazily and the date filters are applied by Twilio
+        window = {'start_time_after': since, 'start_time_before': until}
         
         # Search calls where the phone number is the recipient (to)
-        calls_to = twilio_client.client.calls.list(to=formatted_phone)
-        for call in calls_to:
-            call_sids.add(call.sid)
+        for call in twilio_client.client.calls.stream(to=formatted_phone, **window):
+            calls_by_sid[call.sid] = call
         
         # Search calls where the phone number is the caller (from)
-        calls_from = twilio_client.client.calls.list(from_=formatted_phone)
-        for call in calls_from:
-            call_sids.add(call.sid)
+        for call in twilio_client.client.calls.stream(from_=formatted_phone, **window):
+            calls_by_sid[call.sid] = call
         
+        call_sids = calls_by_sid.keys()
         if not call_sids:
             return []
         
         # Get ElevenLabs conversations
-        elevenlabs_client = ElevenLabsClient()
-        conversations = elevenlabs_client.list_conversations(limit=500)
+        elevenlabs_client = get_elevenlabs_client()
+        conversations = list(elevenlabs_client.iter_conversations(
+            start_after=since.timestamp() if since else None,
+            start_before=until.timestamp() if until else None
+        ))
         
         # Import helper functions from find_conversations_by_phone
-        import re
         def normalize_phone(phone):
-            return re.sub(r'[^\d]', '', str(phone))
+            return _PHONE_DIGITS_RE.sub('', str(phone))
         
         def get_elevenlabs_conversation_call_sid(conversation):
             """Extract Twilio call SID from an ElevenLabs conversation object."""
@@ -375,146 +496,113 @@ def get_user_conversations_data(user_email: str):
                 pass
             return None
         
-        matching_conversations = []
         search_digits = normalize_phone(formatted_phone)
         if formatted_phone.startswith('+1') and len(search_digits) == 11:
             search_variations = [search_digits, search_digits[1:]]
         else:
             search_variations = [search_digits]
         
-        for conv in conversations:
+        def match_conversation(conv):
+            """Fetch one conversation's details and return its entry if it belongs to this user's calls."""
             conv_id = getattr(conv, 'conversation_id', None) or getattr(conv, 'id', None) or getattr(conv, 'conversation_uuid', None)
             if not conv_id:
-                continue
+                return None
+            
+            # The list view often already carries the call SID, which rules most conversations
+            # out without fetching their details
+            listed_call_sid = get_elevenlabs_conversation_call_sid(conv)
+            if listed_call_sid and listed_call_sid not in call_sids:
+                return None
             
             try:
                 full_conv = elevenlabs_client.get_conversation(conv_id)
             except:
                 full_conv = conv
             
-            twilio_call_sid = get_elevenlabs_conversation_call_sid(full_conv)
+            twilio_call_sid = get_elevenlabs_conversation_call_sid(full_conv) or listed_call_sid
             
             if twilio_call_sid and twilio_call_sid in call_sids:
-                # Extract datetime
-                conv_datetime = None
-                datetime_attrs = ['created_at', 'timestamp', 'started_at', 'date_created', 'created', 'start_time', 'updated_at']
+                # Read the start time and duration from one plain-data dump, falling back to metadata
+                dump = full_conv.model_dump() if hasattr(full_conv, 'model_dump') else {}
+                metadata = dump.get('metadata') if isinstance(dump.get('metadata'), dict) else {}
                 
-                for attr in datetime_attrs:
-                    if hasattr(full_conv, attr):
-                        val = getattr(full_conv, attr)
-                        if val:
-                            try:
-                                if isinstance(val, str):
-                                    conv_datetime = datetime.fromisoformat(val.replace('Z', '+00:00'))
-                                elif isinstance(val, datetime):
-                                    conv_datetime = val
-                                else:
-                                    conv_datetime = datetime.fromisoformat(str(val).replace('Z', '+00:00'))
-                                break
-                            except:
-                                pass
-                
-                # Check metadata
-                if not conv_datetime and hasattr(full_conv, 'metadata'):
-                    try:
-                        metadata = full_conv.metadata
-                        if isinstance(metadata, dict):
-                            for key in ['created_at', 'timestamp', 'started_at', 'date_created', 'start_time']:
-                                if key in metadata and metadata[key]:
-                                    try:
-                                        val = metadata[key]
-                                        if isinstance(val, str):
-                                            conv_datetime = datetime.fromisoformat(val.replace('Z', '+00:00'))
-                                        elif isinstance(val, datetime):
-                                            conv_datetime = val
-                                        break
-                                    except:
-                                        pass
-                    except:
-                        pass
-                
-                # Fallback to Twilio
-                if not conv_datetime and twilio_call_sid:
+                conv_datetime = None
+                raw_datetime = _first_present(dump, _DATETIME_ATTRS) or _first_present(metadata, _DATETIME_ATTRS)
+                if raw_datetime:
                     try:
-                        twilio_call = twilio_client.client.calls(twilio_call_sid).fetch()
-                        if twilio_call.start_time:
-                            conv_datetime = twilio_call.start_time
-                        elif twilio_call.date_created:
-                            conv_datetime = twilio_call.date_created
-                    except:
+                        if isinstance(raw_datetime, datetime):
+                            conv_datetime = raw_datetime
+                        else:
+                            conv_datetime = datetime.fromisoformat(str(raw_datetime).replace('Z', '+00:00'))
+                    except ValueError:
                         pass
                 
-                # Extract duration
                 duration = None
-                duration_attrs = ['duration', 'call_duration', 'length', 'call_length']
-                
-                for attr in duration_attrs:
-                    if hasattr(full_conv, attr):
-                        val = getattr(full_conv, attr)
-                        if val:
-                            try:
-                                duration = float(val) if val else None
-                                if duration:
-                                    break
-                            except:
-                                pass
-                
-                if not duration and hasattr(full_conv, 'metadata'):
+                raw_duration = _first_present(dump, _DURATION_ATTRS) or _first_present(metadata, _DURATION_ATTRS)
+                if raw_duration:
                     try:
-                        metadata = full_conv.metadata
-                        if isinstance(metadata, dict):
-                            for key in ['duration', 'call_duration', 'length']:
-                                if key in metadata and metadata[key]:
-                                    try:
-                                        duration = float(metadata[key])
-                                        if duration:
-                                            break
-                                    except:
-                                        pass
-                    except:
+                        duration = float(raw_duration) or None
+                    except (TypeError, ValueError):
                         pass
                 
-                if not duration and twilio_call_sid:
-                    try:
-                        twilio_call = twilio_client.client.calls(twilio_call_sid).fetch()
-                        if twilio_call.duration:
+                # Fallback to the Twilio call already loaded above
+                if not conv_datetime or not duration:
+                    twilio_call = calls_by_sid[twilio_call_sid]
+                    if not conv_datetime:
+                        conv_datetime = twilio_call.start_time or twilio_call.date_created
+                    if not duration and twilio_call.duration:
+                        try:
                             duration = float(twilio_call.duration)
-                    except:
-                        pass
+                        except (TypeError, ValueError):
+                            pass
+                
+                # Naive ElevenLabs times are UTC; normalize everything to aware UTC so the
+                # sort and the per-day grouping below agree on every host
+                if conv_datetime:
+                    if conv_datetime.tzinfo is None:
+                        conv_datetime = conv_datetime.replace(tzinfo=timezone.utc)
+                    else:
+                        conv_datetime = conv_datetime.astimezone(timezone.utc)
                 
-                matching_conversations.append({
+                return {
                     "conversation_id": conv_id,
                     "datetime": conv_datetime,
                     "duration": duration,
                     "twilio_call_sid": twilio_call_sid
-                })
-        
-        # Group by day
-        by_day = defaultdict(lambda: {"total_minutes": 0, "conversations": []})
-        
-        for conv in matching_conversations:
-            if conv["datetime"]:
-                # Get date as string (YYYY-MM-DD)
-                day_key = conv["datetime"].date().isoformat()
-                minutes = (conv["duration"] / 60.0) if conv["duration"] else 0
-                by_day[day_key]["total_minutes"] += minutes
-                by_day[day_key]["conversations"].append({
-                    "conversation_id": conv["conversation_id"],
-                    "twilio_call_sid": conv["twilio_call_sid"],
-                    "duration": conv["duration"],
-                    "datetime": conv["datetime"].isoformat() if conv["datetime"] else None
-                })
-        
-        # Convert to list sorted by date
-        result = []
-        for day in sorted(by_day.keys(), reverse=True):
-            result.append({
+                }
+            
+            return None
+        
+        # Each conversation needs its own ElevenLabs (and possibly Twilio) round-trip, so
+        # fetch them concurrently; map() keeps the results in the original order
+        with ThreadPoolExecutor(max_workers=CONVERSATION_FETCH_WORKERS) as executor:
+            matching_conversations = [entry for entry in executor.map(match_conversation, conversations) if entry]
+        
+        # Group by day, newest first; orjson serializes the date and datetime objects directly
+        dated_conversations = sorted(
+            (conv for conv in matching_conversations if conv["datetime"]),
+            key=lambda conv: conv["datetime"],
+            reverse=True
+        )
+        
+        def day_entry(day, group):
+            day_conversations = [{
+                "conversation_id": conv["conversation_id"],
+                "twilio_call_sid": conv["twilio_call_sid"],
+                "duration": conv["duration"],
+                "datetime": conv["datetime"]
+            } for conv in group]
+            total_minutes = sum((conv["duration"] or 0) for conv in day_conversations) / 60.0
+            return {
                 "date": day,
-                "total_minutes": round(by_day[day]["total_minutes"], 2),
-                "conversations": by_day[day]["conversations"]
-            })
+                "total_minutes": round(total_minutes, 2),
+                "conversations": day_conversations
+            }
         
-        return result
+        return [
+            day_entry(day, group)
+            for day, group in itertools.groupby(dated_conversations, key=lambda conv: conv["datetime"].date())
+        ]
         
     except Exception as e:
         logger.error(f"Error getting user conversations: {str(e)}", exc_info=True)
@@ -542,7 +630,19 @@ def handle_get_conversations():
         if user_data.get('approved') != 'APPROVED':
             return jsonify({'error': 'User not approved'}), 403
         
-        conversations_data = get_user_conversations_data(user_email)
+        # Optional time window (ISO dates), defaulting to the last few months
+        try:
+            since_param = request.args.get('since')
+            until_param = request.args.get('until')
+            if since_param:
+                since = parse_query_datetime(since_param)
+            else:
+                since = datetime.now(timezone.utc) - timedelta(days=CONVERSATIONS_DEFAULT_WINDOW_DAYS)
+            until = parse_query_datetime(until_param) if until_param else None
+        except ValueError:
+            return jsonify({'error': 'since and until must be ISO 8601 dates'}), 400
+        
+        conversations_data = get_user_conversations_data(user_email, since=since, until=until, user_data=user_data)
         
         return jsonify({
             'success': True,
@@ -550,83 +650,99 @@ def handle_get_conversations():
         }), 200
         
     except Exception as e:
-        logger.error(f"Failed to get conversations: {str(e)}", exc_info=True)
-        return jsonify({'error': f'Failed to get conversations: {str(e)}'}), 500
+        err = str(e)
+        logger.error("Failed to get conversations: %s", err, exc_info=True)
+        return jsonify({'error': f'Failed to get conversations: {err}'}), 500
 
-def search_for_summary_recursive(obj, max_depth=10, current_depth=0):
-    """Recursively search for summary in any nested structure."""
-    if current_depth > max_depth:
-        return None
-    
-    if obj is None:
-        return None
-    
-    # Check if this looks like a summary (string with reasonable length)
-    if isinstance(obj, str) and len(obj.strip()) > 20:
-        # Check if it contains summary-like keywords
-        lower_obj = obj.lower()
-        if any(keyword in lower_obj for keyword in ['summary', 'recap', 'overview', 'conclusion', 'key points']):
-            return obj
-        # Or if it's a longer text that might be a summary
-        if len(obj.strip()) > 50:
-            return obj
-    
-    # Check if it's a dict
-    if isinstance(obj, dict):
-        # Check common summary keys first
-        for key in ['summary', 'conversation_summary', 'analysis', 'recap', 'overview', 'conclusion']:
-            if key in obj:
-                val = obj[key]
-                if isinstance(val, str) and val.strip():
-                    return val
-                result = search_for_summary_recursive(val, max_depth, current_depth + 1)
-                if result:
-                    return result
-        
-        # Recursively check all values
-        for value in obj.values():
-            result = search_for_summary_recursive(value, max_depth, current_depth + 1)
-            if result:
-                return result
-    
-    # Check if it's a list
-    elif isinstance(obj, list):
-        for item in obj:
-            result = search_for_summary_recursive(item, max_depth, current_depth + 1)
-            if result:
-                return result
+# Markers of Python object representations (SDK model reprs and their fields) that leak into
+# transcript text, matched in a single pass by one Aho-Corasick automaton
+_OBJ_REPR_PREFIXES = ('role=',)
+_OBJ_REPR_MARKERS = (
+    'AgentMetadata(', 'ConversationHistoryTranscript', 'ConversationTurnMetrics(', 'LlmUsageOutput(',
+    'LlmInputOutputTokensUsage(', 'MetricRecord(', 'agent_metadata=', 'tool_calls=[', 'tool_results=[',
+    'conversation_turn_metrics=', 'llm_usage=', 'time_in_call_secs='
+)
+_OBJ_REPR_AUTOMATON = ahocorasick.Automaton()
+for _marker in _OBJ_REPR_MARKERS:
+    _OBJ_REPR_AUTOMATON.add_word(_marker, _marker)
+_OBJ_REPR_AUTOMATON.make_automaton()
+
+# A repr gives itself away in its first few fields, so only this much of a line is scanned
+_OBJ_REPR_HEAD_LENGTH = 64
+
+def is_object_repr(text: str) -> bool:
+    """Return True if text looks like a Python object representation rather than speech."""
+    if text.startswith(_OBJ_REPR_PREFIXES):
+        return True
+    return next(_OBJ_REPR_AUTOMATON.iter(text[:_OBJ_REPR_HEAD_LENGTH]), None) is not None
+
+def is_plain_speech(text: str) -> bool:
+    """Cheap pre-check for transcript items: short text or text with neither '=' nor '(' near the start."""
+    if text.startswith(_OBJ_REPR_PREFIXES):
+        return False
+    head = text[:_OBJ_REPR_HEAD_LENGTH]
+    return len(head) < 20 or ('=' not in head and '(' not in head)
+
+def looks_like_summary(text: str) -> bool:
+    """Heuristic for whether a free-standing string is a conversation summary."""
+    stripped = text.strip()
+    if len(stripped) <= 20:
+        return False
+    # Check if it contains summary-like keywords
+    lower_text = stripped.lower()
+    if any(keyword in lower_text for keyword in ['summary', 'recap', 'overview', 'conclusion', 'key points']):
+        return True
+    # Or if it's a longer text that might be a summary
+    return len(stripped) > 50
+
+# Marks a missing attribute in getattr() so presence and value take a single lookup
+_SENTINEL = object()
+
+# Keys that hold a conversation summary, in priority order
+_SUMMARY_KEYS = ('summary', 'conversation_summary', 'analysis', 'recap', 'overview', 'conclusion')
+_SUMMARY_KEYSET = frozenset(_SUMMARY_KEYS)
+
+def search_for_summary(root, max_depth=10):
+    """
+    Breadth-first search for a summary in a plain nested dict/list structure
+    (e.g. the output of model_dump()). Summary keys are checked before descending.
+    """
+    queue = deque([(root, 0)])
+    visited = set()
     
-    # Check if it's an object with attributes
-    elif hasattr(obj, '__dict__'):
-        # Check common summary attributes
-        for attr_name in ['summary', 'conversation_summary', 'analysis', 'recap', 'overview', 'conclusion']:
-            if hasattr(obj, attr_name):
-                try:
-                    val = getattr(obj, attr_name)
-                    if isinstance(val, str) and val.strip():
-                        return val
-                    result = search_for_summary_recursive(val, max_depth, current_depth + 1)
-                    if result:
-                        return result
-                except:
-                    pass
-        
-        # Try model_dump or dict method
-        if hasattr(obj, 'model_dump'):
-            try:
-                obj_dict = obj.model_dump()
-                return search_for_summary_recursive(obj_dict, max_depth, current_depth + 1)
-            except:
-                pass
-        elif hasattr(obj, 'dict'):
-            try:
-                obj_dict = obj.dict()
-                return search_for_summary_recursive(obj_dict, max_depth, current_depth + 1)
-            except:
-                pass
+    while queue:
+        obj, depth = queue.popleft()
+        if obj is None or depth > max_depth:
+            continue
+        
+        if isinstance(obj, str):
+            if looks_like_summary(obj):
+                return obj
+            continue
+        
+        if id(obj) in visited:
+            continue
+        visited.add(id(obj))
+        
+        if isinstance(obj, dict):
+            # Check common summary keys first
+            hit = _SUMMARY_KEYSET & obj.keys()
+            if hit:
+                for key in _SUMMARY_KEYS:
+                    if key in hit:
+                        val = obj[key]
+                        if isinstance(val, str) and val.strip():
+                            return val
+            queue.extend((value, depth + 1) for value in obj.values())
+        elif isinstance(obj, (list, tuple)):
+            queue.extend((item, depth + 1) for item in obj)
     
     return None
 
+# (summary, transcript) for finished conversations, keyed by conversation_id
+_conversation_details_cache = LRUCache(maxsize=1000)
+_conversation_details_cache_lock = threading.Lock()
+
 @app.route('/api/conversation/details', methods=['GET'])
 def handle_get_conversation_details():
     """Get summary and transcript for an ElevenLabs conversation"""
@@ -636,8 +752,18 @@ def handle_get_conversation_details():
         if not conversation_id:
             return jsonify({'error': 'conversation_id is required'}), 400
         
+        with _conversation_details_cache_lock:
+            cached_details = _conversation_details_cache.get(conversation_id)
+        if cached_details is not None:
+            summary, transcript = cached_details
+            return jsonify({
+                'success': True,
+                'summary': summary,
+                'transcript': transcript
+            }), 200
+        
         try:
-            elevenlabs_client = ElevenLabsClient()
+            elevenlabs_client = get_elevenlabs_client()
         except Exception as e:
             raise ValueError(f"Error initializing ElevenLabs client: {e}")
         
@@ -645,14 +771,13 @@ def handle_get_conversation_details():
         try:
             conversation = elevenlabs_client.get_conversation(conversation_id)
         except Exception as e:
-            logger.error(f"Error fetching conversation {conversation_id}: {str(e)}")
-            return jsonify({'error': f'Failed to fetch conversation: {str(e)}'}), 500
+            err = str(e)
+            logger.error("Error fetching conversation %s: %s", conversation_id, err)
+            return jsonify({'error': f'Failed to fetch conversation: {err}'}), 500
         
         # Extract summary - try direct attributes first
         summary = None
-        summary_attrs = ['summary', 'conversation_summary', 'analysis', 'recap', 'overview', 'conclusion']
-        
-        for attr in summary_attrs:
+        for attr in _SUMMARY_KEYS:
             if hasattr(conversation, attr):
                 val = getattr(conversation, attr)
                 if val:
@@ -670,9 +795,15 @@ def handle_get_conversation_details():
                         if summary:
                             break
         
-        # If not found, recursively search the entire conversation object
+        # If not found, search the entire conversation, dumped to plain data once
         if not summary:
-            summary = search_for_summary_recursive(conversation)
+            if hasattr(conversation, 'model_dump'):
+                conversation_data = conversation.model_dump()
+            elif hasattr(conversation, 'dict'):
+                conversation_data = conversation.dict()
+            else:
+                conversation_data = conversation
+            summary = search_for_summary(conversation_data)
         
         # Extract transcript using the existing method
         transcript = None
@@ -729,9 +860,6 @@ def handle_get_conversation_details():
                                            item_dict.get('content'))
                             if message_text:
                                 message_text = str(message_text).strip()
-                                # If it's still an object representation, skip it
-                                if message_text.startswith("role=") or 'AgentMetadata(' in message_text:
-                                    message_text = None
                         except:
                             pass
                     
@@ -742,78 +870,37 @@ def handle_get_conversation_details():
                                        item.get('content'))
                         if message_text:
                             message_text = str(message_text).strip()
-                            # If it's an object representation, skip it
-                            if message_text.startswith("role=") or 'AgentMetadata(' in message_text:
-                                message_text = None
                     
                     # Only add if we have actual message text (not None, not empty, not object representation)
                     if message_text and len(message_text) > 0:
-                        # Final check - filter out any object representations that slipped through
-                        is_object_repr = False
-                        
-                        # Check for Pydantic model representations
-                        if message_text.startswith("role="):
-                            is_object_repr = True
-                        elif 'role=' in message_text and ('agent_metadata=' in message_text or 'AgentMetadata(' in message_text):
-                            is_object_repr = True
-                        elif 'ConversationHistoryTranscriptToolCallCommonModel(' in message_text:
-                            is_object_repr = True
-                        elif 'ConversationHistoryTranscriptOtherToolsResultCommonModel(' in message_text:
-                            is_object_repr = True
-                        elif 'ConversationTurnMetrics(' in message_text:
-                            is_object_repr = True
-                        elif 'LlmUsageOutput(' in message_text or 'LlmInputOutputTokensUsage(' in message_text:
-                            is_object_repr = True
-                        elif 'MetricRecord(' in message_text:
-                            is_object_repr = True
-                        # Check for patterns like: role='agent' agent_metadata=...
-                        elif (message_text.count("=") > 3 and message_text.count("(") > 0 and message_text.count(")") > 0):
-                            # If it looks like a Python object representation, skip it
-                            if any(keyword in message_text for keyword in ['agent_metadata', 'tool_calls', 'tool_results', 'conversation_turn_metrics', 'llm_usage', 'time_in_call_secs']):
-                                is_object_repr = True
-                        
-                        if not is_object_repr:
+                        # Filter out object representations, whichever path the text came from;
+                        # the item-level reprs all open with 'role=' or 'SomeModel(' so plain speech skips the scan
+                        if not is_plain_speech(message_text) and is_object_repr(message_text):
+                            continue
+                        if '\n' not in message_text:
                             transcript_parts.append(message_text)
+                            continue
+                        # Multi-line text is cleaned line by line, dropping blanks and embedded reprs
+                        for line in message_text.split('\n'):
+                            line = line.strip()
+                            if line and not is_object_repr(line):
+                                transcript_parts.append(line)
                 
                 if transcript_parts:
-                    # Join and clean up the transcript
-                    full_transcript = '\n'.join(transcript_parts)
-                    # Remove any remaining object representations that might have slipped through
-                    lines = full_transcript.split('\n')
-                    cleaned_lines = []
-                    for line in lines:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        # Skip lines that look like object representations
-                        if (line.startswith("role=") or 
-                            'AgentMetadata(' in line or 
-                            'ConversationHistoryTranscript' in line or
-                            'ConversationTurnMetrics(' in line or
-                            'LlmUsageOutput(' in line or
-                            'MetricRecord(' in line or
-                            ('agent_metadata=' in line and '=' in line and '(' in line) or
-                            ('tool_calls=' in line and '[' in line) or
-                            ('tool_results=' in line and '[' in line) or
-                            ('conversation_turn_metrics=' in line) or
-                            ('llm_usage=' in line) or
-                            ('time_in_call_secs=' in line)):
-                            continue
-                        cleaned_lines.append(line)
-                    transcript = '\n'.join(cleaned_lines)
+                    transcript = '\n'.join(transcript_parts)
                     
                 # Log for debugging
-                if transcript_obj and len(transcript_obj) > 0:
+                if logger.isEnabledFor(logging.DEBUG) and transcript_obj:
                     first_item = transcript_obj[0]
-                    logger.info(f"Transcript list item type: {type(first_item).__name__}")
+                    logger.debug(f"Transcript list item type: {type(first_item).__name__}")
                     if hasattr(first_item, '__dict__'):
                         item_attrs = [a for a in dir(first_item) if not a.startswith('_')]
-                        logger.info(f"Transcript item has {len(item_attrs)} attributes: {item_attrs[:10]}")
+                        logger.debug(f"Transcript item has {len(item_attrs)} attributes: {item_attrs[:10]}")
                         # Try common text attributes
                         for attr in ['text', 'content', 'message', 'transcript', 'transcription']:
-                            if hasattr(first_item, attr):
-                                val = getattr(first_item, attr)
-                                logger.info(f"  {attr}: {type(val).__name__} - {str(val)[:100] if val else 'None'}")
+                            val = getattr(first_item, attr, _SENTINEL)
+                            if val is not _SENTINEL:
+                                logger.debug(f"  {attr}: {type(val).__name__} - {str(val)[:100] if val else 'None'}")
         
         # Check analysis object for transcript_summary
         if not summary and hasattr(conversation, 'analysis'):
@@ -829,19 +916,25 @@ def handle_get_conversation_details():
                 pass
         
         # Log for debugging
-        logger.info(f"Conversation {conversation_id} - Summary found: {summary is not None}, Transcript found: {transcript is not None}")
+        logger.debug("Conversation %s - Summary found: %s, Transcript found: %s", conversation_id, summary is not None, transcript is not None)
         
         # Debug: Log all attributes of the conversation object
-        try:
-            attrs = [a for a in dir(conversation) if not a.startswith('_')]
-            logger.info(f"Conversation {conversation_id} has {len(attrs)} attributes")
-            # Log a few key attributes
-            for attr in ['summary', 'transcript', 'transcription', 'analysis', 'metadata']:
-                if hasattr(conversation, attr):
-                    val = getattr(conversation, attr)
-                    logger.info(f"  {attr}: {type(val).__name__} - {str(val)[:100] if val else 'None'}")
-        except:
-            pass
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                attrs = [a for a in dir(conversation) if not a.startswith('_')]
+                logger.debug(f"Conversation {conversation_id} has {len(attrs)} attributes")
+                # Log a few key attributes
+                for attr in ['summary', 'transcript', 'transcription', 'analysis', 'metadata']:
+                    val = getattr(conversation, attr, _SENTINEL)
+                    if val is not _SENTINEL:
+                        logger.debug(f"  {attr}: {type(val).__name__} - {str(val)[:100] if val else 'None'}")
+            except:
+                pass
+        
+        # Finished conversations never change, so later requests can skip the extraction entirely
+        if is_conversation_final(conversation):
+            with _conversation_details_cache_lock:
+                _conversation_details_cache[conversation_id] = (summary, transcript)
         
         return jsonify({
             'success': True,
@@ -850,8 +943,9 @@ def handle_get_conversation_details():
         }), 200
         
     except Exception as e:
-        logger.error(f"Failed to get conversation details: {str(e)}", exc_info=True)
-        return jsonify({'error': f'Failed to get conversation details: {str(e)}'}), 500
+        err = str(e)
+        logger.error("Failed to get conversation details: %s", err, exc_info=True)
+        return jsonify({'error': f'Failed to get conversation details: {err}'}), 500
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Run Journie Flask server')
@@ -863,10 +957,15 @@ if __name__ == '__main__':
     is_local = args.local and not is_production
     
     if is_local:
-        # Local development mode
+        # Local development mode - a single process, so a throwaway session key is fine
+        if not app.secret_key:
+            app.secret_key = os.urandom(24).hex()
         app.run(debug=True, host='127.0.0.1', port=5000)
     else:
-        # Production mode for Render.com
-        port = int(os.environ.get('PORT', 5000))
-        app.run(debug=False, host='0.0.0.0', port=port)
+        if not os.getenv('SECRET_KEY'):
+            parser.error('SECRET_KEY must be set outside --local mode')
+        # Production mode for Render.com - hand off to gunicorn (see gunicorn.conf.py)
+        # instead of Werkzeug's development server, which handles one request at a time
+        backend_dir = os.path.dirname(os.path.abspath(__file__))
+        os.execvp('gunicorn', ['gunicorn', '--chdir', backend_dir, 'app:app'])
 
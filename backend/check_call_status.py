@@ -1,6 +1,7 @@
 """
 Check the status of a Twilio call by Call SID.
 """
+import functools
 import os
 import sys
 from dotenv import load_dotenv
@@ -8,78 +9,93 @@ from src.twilio_client import TwilioClient
 
 load_dotenv()
 
+# Report lines for each call status; {status}, {error_code} and {error_message} are filled in
+_IN_PROGRESS_MESSAGES = ("\n🔄 Call in Progress", "Current status: {status}")
+_STATUS_MESSAGES = {
+    'failed': ("\n❌ Call Failed!", "Error Code: {error_code}", "Error Message: {error_message}"),
+    'no-answer': ("\n⚠️  No Answer", "The phone rang but wasn't answered."),
+    'busy': ("\n⚠️  Busy", "The recipient's phone was busy."),
+    'canceled': ("\n⚠️  Canceled", "The call was canceled."),
+    'completed': ("\n✅ Call Completed Successfully",),
+    'queued': _IN_PROGRESS_MESSAGES,
+    'ringing': _IN_PROGRESS_MESSAGES,
+}
+
+
+@functools.lru_cache(maxsize=1)
+def get_twilio_client() -> TwilioClient:
+    """Return the TwilioClient shared by every check in this process."""
+    return TwilioClient()
+
 
 def check_call_status(call_sid: str):
     """Check the status of a Twilio call."""
+    # Collect the report and write it out in one go at the end
+    lines = []
     try:
-        client = TwilioClient()
+        client = get_twilio_client()
         
         # Fetch the call details
-        call = client.client.calls(call_sid).fetch()
+        call = client.fetch_call(call_sid)
+        status = call.status
+        duration = call.duration
+        error_code = getattr(call, 'error_code', None)
+        error_message = getattr(call, 'error_message', None)
         
-        print("=" * 60)
-        print(f"Call Status: {call_sid}")
-        print("=" * 60)
-        print(f"Status: {call.status}")
-        print(f"Direction: {call.direction}")
-        # Handle from_ attribute safely
-        call_from = getattr(call, 'from_', getattr(call, 'from_formatted', 'N/A'))
-        print(f"From: {call_from}")
-        print(f"To: {call.to}")
-        print(f"Duration: {call.duration} seconds")
-        print(f"Price: ${call.price}" if call.price else "Price: N/A")
-        print(f"Start Time: {call.start_time}")
-        print(f"End Time: {call.end_time}")
+        lines.append("=" * 60)
+        lines.append(f"Call Status: {call_sid}")
+        lines.append("=" * 60)
+        lines.append(f"Status: {status}")
+        lines.append(f"Direction: {call.direction}")
+        # Handle from_ attribute safely (read from the instance dict - no AttributeError fallbacks)
+        call_fields = vars(call)
+        call_from = call_fields.get('from_') or call_fields.get('from_formatted', 'N/A')
+        lines.append(f"From: {call_from}")
+        lines.append(f"To: {call.to}")
+        lines.append(f"Duration: {duration} seconds")
+        lines.append(f"Price: ${call.price}" if call.price else "Price: N/A")
+        lines.append(f"Start Time: {call.start_time}")
+        lines.append(f"End Time: {call.end_time}")
         
         # Check for errors
-        if call.status == 'failed':
-            print(f"\n❌ Call Failed!")
-            print(f"Error Code: {call.error_code}")
-            print(f"Error Message: {call.error_message}")
-        elif call.status == 'no-answer':
-            print(f"\n⚠️  No Answer")
-            print("The phone rang but wasn't answered.")
-        elif call.status == 'busy':
-            print(f"\n⚠️  Busy")
-            print("The recipient's phone was busy.")
-        elif call.status == 'canceled':
-            print(f"\n⚠️  Canceled")
-            print("The call was canceled.")
-        elif call.status == 'completed':
-            print(f"\n✅ Call Completed Successfully")
-        elif call.status == 'queued' or call.status == 'ringing':
-            print(f"\n🔄 Call in Progress")
-            print(f"Current status: {call.status}")
+        for template in _STATUS_MESSAGES.get(status, ()):
+            lines.append(template.format(status=status, error_code=error_code, error_message=error_message))
         
         # Get call events for more details
-        print(f"\n📋 Call Details:")
-        print(f"   Account SID: {call.account_sid}")
-        print(f"   Phone Number SID: {call.phone_number_sid}")
+        lines.append(f"\n📋 Call Details:")
+        lines.append(f"   Account SID: {call.account_sid}")
+        lines.append(f"   Phone Number SID: {call.phone_number_sid}")
         
         # Check if there's additional info
         if hasattr(call, 'answered_by'):
-            print(f"   Answered By: {call.answered_by}")
+            lines.append(f"   Answered By: {call.answered_by}")
         if hasattr(call, 'caller_name'):
-            print(f"   Caller Name: {call.caller_name}")
+            lines.append(f"   Caller Name: {call.caller_name}")
         
         # Check call outcome
-        print(f"\n💡 Call Analysis:")
-        if call.status == 'completed' and call.duration and int(call.duration) > 0:
-            print(f"   ✅ Call connected and lasted {call.duration} seconds")
-            print(f"   This suggests the call went through - possibly to voicemail")
-            print(f"   or was answered but phone was on silent/Do Not Disturb")
-        elif call.status == 'no-answer':
-            print(f"   ⚠️  Phone rang but wasn't answered")
-        elif call.status == 'failed':
-            print(f"   ❌ Call failed to connect")
+        lines.append(f"\n💡 Call Analysis:")
+        if status == 'completed' and duration and int(duration) > 0:
+            lines.append(f"   ✅ Call connected and lasted {duration} seconds")
+            lines.append(f"   This suggests the call went through - possibly to voicemail")
+            lines.append(f"   or was answered but phone was on silent/Do Not Disturb")
+        elif status == 'no-answer':
+            lines.append(f"   ⚠️  Phone rang but wasn't answered")
+        elif status == 'failed':
+            lines.append(f"   ❌ Call failed to connect")
             if hasattr(call, 'error_code'):
-                print(f"   Error code: {call.error_code}")
-                print(f"   Error message: {call.error_message}")
+                lines.append(f"   Error code: {error_code}")
+                lines.append(f"   Error message: {error_message}")
         
     except Exception as e:
-        print(f"❌ Error checking call status: {e}")
+        lines.append(f"❌ Error checking call status: {e}")
+        # Flush the partial report first so the traceback (on stderr) follows the output it belongs to
+        sys.stdout.write('\n'.join(lines) + '\n')
+        sys.stdout.flush()
         import traceback
         traceback.print_exc()
+        return
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 if __name__ == "__main__":
@@ -5,7 +5,6 @@ import os
 import sys
 from dotenv import load_dotenv
 from src.db import get_db_connection
-from src.auth import get_user_by_email
 
 load_dotenv()
 
@@ -19,28 +18,18 @@ if __name__ == "__main__":
     print(f"Checking approval status for: {email}")
     print("=" * 60)
     
-    # Check via function
-    user_data = get_user_by_email(email)
-    if user_data:
-        print(f"Via get_user_by_email():")
-        print(f"  Approval: {user_data.get('approved')}")
-        print(f"  Type: {type(user_data.get('approved'))}")
-    else:
-        print("User not found via get_user_by_email()")
-    
-    # Check directly in database
-    print("\nDirect database query:")
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, email, approved, approved::text
-                FROM users 
-                WHERE email = %s
-            """, (email,))
+            cursor.execute(
+                "SELECT id, email, approved, approved::text FROM users WHERE email = %s",
+                (email,)
+            )
             user = cursor.fetchone()
             cursor.close()
             
+            # Check directly in database
+            print("\nDirect database query:")
             if user:
                 print(f"  ID: {user[0]}")
                 print(f"  Email: {user[1]}")
@@ -49,25 +38,22 @@ if __name__ == "__main__":
                 print(f"  Type: {type(user[2])}")
             else:
                 print("  User not found in database")
-    except Exception as e:
-        print(f"  Error querying database: {e}")
-    
-    # List all users with their approval status
-    print("\n" + "=" * 60)
-    print("All users in database:")
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
+            
+            # List all users with their approval status, formatted by Postgres and streamed
+            # from a server-side cursor so the whole table is never held in memory
+            print("\n" + "=" * 60)
+            print("All users in database:")
+            cursor = conn.cursor(name='all_users')
+            cursor.itersize = 1000
             cursor.execute("""
-                SELECT id, email, approved
-                FROM users 
+                SELECT format(E'  ID %s: %s - %s\\n', id, email, coalesce(approved::text, 'None'))
+                FROM users
                 ORDER BY id
             """)
-            users = cursor.fetchall()
+            write = sys.stdout.write
+            for (line,) in cursor:
+                write(line)
             cursor.close()
-            
-            for user in users:
-                print(f"  ID {user[0]}: {user[1]} - {user[2]}")
     except Exception as e:
         print(f"  Error querying database: {e}")
-
+        sys.exit(1)
@@ -1,16 +1,44 @@
 """
 Fetch corresponding ElevenLabs conversation from a Twilio call SID.
 """
-import os
+import re
 import sys
 import argparse
-from datetime import datetime, timedelta
+import ciso8601
+import functools
+import itertools
+import operator
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from src.twilio_client import TwilioClient
 from src.elevenlabs_client import ElevenLabsClient
+from src.conversation_cache import get_conversation_cached
+from src import elevenlabs_index
 
 load_dotenv()
 
+_NON_DIGIT_RE = re.compile(r'\D')
+
+# Getters for the attributes read on every conversation checked
+_model_dump = operator.attrgetter('model_dump')
+_model_dump_json = operator.attrgetter('model_dump_json')
+_metadata = operator.attrgetter('metadata')
+
+# Conversations with more transcript turns than this are dumped via JSON + orjson, which builds
+# the nested dicts in C; below it the JSON round-trip costs more than it saves
+LARGE_CONVERSATION_TURNS = 50
+
+# Concurrent ElevenLabs conversation fetches while searching
+FETCH_WORKERS = 20
+
+# Conversations requested per ElevenLabs list page
+LIST_PAGE_SIZE = 50
+
+# A conversation matches a call by phone number if it started within this many seconds of it
+MATCH_WINDOW_SECONDS = 300
+
 
 def get_twilio_call_details(call_sid: str) -> dict:
     """
@@ -43,78 +71,101 @@ def get_twilio_call_details(call_sid: str) -> dict:
         raise Exception(f"Error fetching Twilio call details: {e}")
 
 
-def search_for_call_sid_recursive(obj, target_sid: str, path: str = "", max_depth: int = 10, current_depth: int = 0):
+def dump_conversation(conversation) -> dict:
+    """Plain nested dict/list copy of a conversation, for path lookups and searching."""
+    try:
+        if len(getattr(conversation, 'transcript', None) or ()) > LARGE_CONVERSATION_TURNS:
+            return orjson.loads(_model_dump_json(conversation)())
+        return _model_dump(conversation)()
+    except AttributeError:
+        return conversation if isinstance(conversation, dict) else {}
+
+
+def to_epoch_seconds(value) -> float:
     """
-    Recursively search for Twilio call SID in any nested structure.
+    Convert an ISO 8601 string or datetime to Unix epoch seconds (naive values are taken as UTC).
     
     Returns:
-        Tuple of (found_value, path_where_found) or (None, None)
+        Epoch seconds, or None if the value can't be parsed
     """
-    if current_depth > max_depth:
-        return None, None
-    
-    if obj is None:
-        return None, None
-    
-    # Check if this is the value we're looking for
-    obj_str = str(obj).strip()
-    if obj_str == target_sid:
-        return obj, path
-    
-    # Check if it's a dict
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            # Check the key itself
-            if str(key).strip() == target_sid:
-                return key, f"{path}.{key}"
-            # Recursively check the value
-            new_path = f"{path}.{key}" if path else key
-            found, found_path = search_for_call_sid_recursive(value, target_sid, new_path, max_depth, current_depth + 1)
-            if found:
-                return found, found_path
-    
-    # Check if it's a list
-    elif isinstance(obj, list):
-        for idx, item in enumerate(obj):
-            new_path = f"{path}[{idx}]" if path else f"[{idx}]"
-            found, found_path = search_for_call_sid_recursive(item, target_sid, new_path, max_depth, current_depth + 1)
-            if found:
-                return found, found_path
+    if isinstance(value, str):
+        try:
+            value = ciso8601.parse_datetime(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_phone(phone: str) -> str:
+    """Strip everything but digits from a phone number (memoized - callers repeat across conversations)."""
+    return _NON_DIGIT_RE.sub('', phone)
+
+
+def search_for_call_sid(root, target_sid: str, max_depth: int = 10):
+    """
+    Search for Twilio call SID in a plain nested dict/list structure (e.g. the output of
+    model_dump()), depth-first with an explicit stack.
     
-    # Check if it's an object with attributes
-    elif hasattr(obj, '__dict__'):
-        for attr_name in dir(obj):
-            if attr_name.startswith('_'):
-                continue
-            try:
-                attr_value = getattr(obj, attr_name)
-                if callable(attr_value):
-                    continue
-                new_path = f"{path}.{attr_name}" if path else attr_name
-                found, found_path = search_for_call_sid_recursive(attr_value, target_sid, new_path, max_depth, current_depth + 1)
-                if found:
-                    return found, found_path
-            except:
-                pass
+    Returns:
+        Tuple of (found_value, path_where_found) or (None, None)
+    """
+    target_len = len(target_sid)
+    stack = [(root, "", 0)]
     
-    # Try to convert to dict if it has model_dump or dict method
-    if hasattr(obj, 'model_dump'):
-        try:
-            obj_dict = obj.model_dump()
-            return search_for_call_sid_recursive(obj_dict, target_sid, path, max_depth, current_depth + 1)
-        except:
-            pass
-    elif hasattr(obj, 'dict'):
-        try:
-            obj_dict = obj.dict()
-            return search_for_call_sid_recursive(obj_dict, target_sid, path, max_depth, current_depth + 1)
-        except:
-            pass
+    while stack:
+        obj, path, depth = stack.pop()
+        if obj is None or depth > max_depth:
+            continue
+        
+        # Check if it's a dict
+        if isinstance(obj, dict):
+            children = []
+            for key, value in obj.items():
+                # Check the key itself
+                if key == target_sid:
+                    return key, f"{path}.{key}"
+                children.append((value, f"{path}.{key}" if path else key, depth + 1))
+            # Reversed so children are visited in their original order
+            stack.extend(reversed(children))
+        
+        # Check if it's a list
+        elif isinstance(obj, list):
+            stack.extend(
+                (item, f"{path}[{idx}]" if path else f"[{idx}]", depth + 1)
+                for idx, item in reversed(list(enumerate(obj)))
+            )
+        
+        # Check if this is the value we're looking for - SIDs are fixed-length "CA..." strings, so
+        # anything else is rejected without building or stripping a string
+        elif isinstance(obj, str) and len(obj) == target_len and obj.startswith('CA') and obj == target_sid:
+            return obj, path
     
     return None, None
 
 
-def find_elevenlabs_conversation_by_call_sid(twilio_call_sid: str, phone_number: str = None, call_timestamp: datetime = None, debug: bool = False) -> dict:
+def sync_conversation_index(elevenlabs_client: ElevenLabsClient, debug: bool = False):
+    """
+    Bring the local call SID index up to date, ignoring failures (the search falls back to listing).
+    
+    Args:
+        elevenlabs_client: ElevenLabs client used to list and fetch conversations
+        debug: If True, print debug information
+    """
+    try:
+        added = elevenlabs_index.ensure_index(elevenlabs_client, get_conversation=get_conversation_cached)
+        if debug:
+            print(f"  Indexed {added} new conversations")
+    except Exception as e:
+        if debug:
+            print(f"  Conversation index sync failed: {e}")
+
+
+def find_elevenlabs_conversation_by_call_sid(twilio_call_sid: str, phone_number: str = None, call_timestamp: datetime = None, debug: bool = False, elevenlabs_client: ElevenLabsClient = None, index_synced: bool = False) -> dict:
     """
     Find ElevenLabs conversation corresponding to a Twilio call SID.
     
@@ -123,87 +174,109 @@ def find_elevenlabs_conversation_by_call_sid(twilio_call_sid: str, phone_number:
         phone_number: Optional phone number to narrow search (from Twilio call)
         call_timestamp: Optional call timestamp to narrow search (from Twilio call)
         debug: If True, print debug information
+        elevenlabs_client: Optional ElevenLabs client to reuse
+        index_synced: If True, the caller has already synced the local index
     
     Returns:
         Dictionary with conversation details or None if not found
     """
-    try:
-        elevenlabs_client = ElevenLabsClient()
-    except Exception as e:
-        raise ValueError(f"Error initializing ElevenLabs client: {e}")
+    if elevenlabs_client is None:
+        try:
+            elevenlabs_client = ElevenLabsClient()
+        except Exception as e:
+            raise ValueError(f"Error initializing ElevenLabs client: {e}")
+    
+    if not index_synced:
+        sync_conversation_index(elevenlabs_client, debug=debug)
     
-    # Get all conversations (or recent ones if we have a timestamp)
-    limit = 500 if not call_timestamp else 100
+    # The local index usually knows the conversation for a call already
     try:
-        conversations = elevenlabs_client.list_conversations(limit=limit)
+        indexed_conv_id = elevenlabs_index.lookup(twilio_call_sid)
     except Exception as e:
-        raise Exception(f"Error listing ElevenLabs conversations: {e}")
+        if debug:
+            print(f"  Conversation index unavailable: {e}")
+        indexed_conv_id = None
     
-    print(f"Searching through {len(conversations)} ElevenLabs conversations...")
+    if indexed_conv_id:
+        if debug:
+            print(f"  ✓ Found conversation {indexed_conv_id} in the local index")
+        return {
+            "conversation_id": indexed_conv_id,
+            "conversation": get_conversation_cached(elevenlabs_client, indexed_conv_id),
+            "match_method": "twilio_call_sid",
+            "twilio_call_sid": twilio_call_sid,
+            "found_path": "conversation_initiation_client_data.dynamic_variables.system__call_sid"
+        }
     
-    # Search for conversation with matching Twilio call SID
-    for idx, conv in enumerate(conversations, 1):
-        conv_id = getattr(conv, 'conversation_id', None) or getattr(conv, 'id', None) or getattr(conv, 'conversation_uuid', None)
+    # Call time as epoch seconds (naive values taken as UTC), used both for the listing window
+    # and for each conversation comparison, which is then a float subtraction
+    call_time = to_epoch_seconds(call_timestamp)
+    
+    # With a call timestamp, let ElevenLabs return only conversations started around the call
+    conversations = None
+    if call_time is not None:
+        try:
+            conversations = list(elevenlabs_client.iter_conversations(
+                start_after=call_time - MATCH_WINDOW_SECONDS,
+                start_before=call_time + MATCH_WINDOW_SECONDS
+            ))
+        except Exception as e:
+            if debug:
+                print(f"  Filtered conversation listing failed, scanning recent conversations: {e}")
+    
+    # Otherwise (or if that failed) scan the most recent conversations, a page at a time so a
+    # match near the top stops the listing early
+    if conversations is None:
+        limit = 500 if not call_timestamp else 100
+        conversations = itertools.islice(elevenlabs_client.iter_conversations(page_size=LIST_PAGE_SIZE), limit)
+        print(f"Searching through up to {limit} recent ElevenLabs conversations...")
+    else:
+        print(f"Searching through {len(conversations)} ElevenLabs conversations...")
+    conversations = iter(conversations)
+    
+    # Last 10 digits of the number being searched for, compared against each conversation
+    search_digits = normalize_phone(str(phone_number))[-10:] if phone_number else None
+    
+    def match_conversation(idx, conv):
+        """Fetch one conversation and return its match details, or None if it is not the call."""
+        conv_id = getattr(conv, id_attr, None) if id_attr else None
         if not conv_id:
-            continue
+            return None
         
         if debug and idx <= 5:  # Debug first 5 conversations
             print(f"  Checking conversation {idx}: {conv_id}")
         
-        # Get full conversation details
-        try:
-            full_conv = elevenlabs_client.get_conversation(conv_id)
-        except:
+        # Use the list item as-is when it already carries the client data; otherwise fetch full details
+        if getattr(conv, 'conversation_initiation_client_data', None) is not None:
             full_conv = conv
+        else:
+            try:
+                full_conv = get_conversation_cached(elevenlabs_client, conv_id)
+            except:
+                full_conv = conv
+        
+        # Work on a plain dict of the conversation, dumped once
+        conv_data = dump_conversation(full_conv)
         
         # First, check the known path where Twilio call SID is stored
         # Path: conversation_initiation_client_data.dynamic_variables.system__call_sid
         found_value = None
         found_path = None
         
-        try:
-            if hasattr(full_conv, 'conversation_initiation_client_data'):
-                client_data = full_conv.conversation_initiation_client_data
-                
-                # Check if it's a dict or object
-                if isinstance(client_data, dict):
-                    dynamic_vars = client_data.get('dynamic_variables', {})
-                    if isinstance(dynamic_vars, dict):
-                        found_value = dynamic_vars.get('system__call_sid')
-                        if found_value and str(found_value).strip() == twilio_call_sid:
-                            found_path = "conversation_initiation_client_data.dynamic_variables.system__call_sid"
-                elif hasattr(client_data, 'dynamic_variables'):
-                    dynamic_vars = client_data.dynamic_variables
-                    if isinstance(dynamic_vars, dict):
-                        found_value = dynamic_vars.get('system__call_sid')
-                    elif hasattr(dynamic_vars, 'system__call_sid'):
-                        found_value = getattr(dynamic_vars, 'system__call_sid')
-                    elif hasattr(dynamic_vars, 'system_call_sid'):  # Try without double underscore
-                        found_value = getattr(dynamic_vars, 'system_call_sid')
-                    
-                    if found_value and str(found_value).strip() == twilio_call_sid:
-                        found_path = "conversation_initiation_client_data.dynamic_variables.system__call_sid"
-                
-                # Also try model_dump if it's a Pydantic model
-                if not found_value and hasattr(client_data, 'model_dump'):
-                    try:
-                        client_data_dict = client_data.model_dump()
-                        dynamic_vars = client_data_dict.get('dynamic_variables', {})
-                        if isinstance(dynamic_vars, dict):
-                            found_value = dynamic_vars.get('system__call_sid')
-                            if found_value and str(found_value).strip() == twilio_call_sid:
-                                found_path = "conversation_initiation_client_data.dynamic_variables.system__call_sid"
-                    except:
-                        pass
-        except Exception as e:
-            if debug:
-                print(f"  Error checking known path: {e}")
+        call_sid = None
+        client_data = conv_data.get("conversation_initiation_client_data") if isinstance(conv_data, dict) else None
+        dynamic_variables = client_data.get("dynamic_variables") if isinstance(client_data, dict) else None
+        if isinstance(dynamic_variables, dict):
+            call_sid = dynamic_variables.get("system__call_sid")
+        if call_sid and str(call_sid).strip() == twilio_call_sid:
+            found_value = call_sid
+            found_path = "conversation_initiation_client_data.dynamic_variables.system__call_sid"
         
-        # If not found in known path, fall back to recursive search
-        if not found_value:
+        # Only search the whole conversation if the known path is missing entirely
+        if not found_value and not call_sid:
             if debug:
                 print(f"  Not found in known path, trying recursive search...")
-            found_value, found_path = search_for_call_sid_recursive(full_conv, twilio_call_sid)
+            found_value, found_path = search_for_call_sid(conv_data, twilio_call_sid)
         
         if found_value:
             if debug:
@@ -217,20 +290,19 @@ def find_elevenlabs_conversation_by_call_sid(twilio_call_sid: str, phone_number:
             }
         
         # If we have phone number and timestamp, try matching by those (fallback)
-        if phone_number and call_timestamp:
+        if phone_number and call_time is not None:
             # Extract phone number from conversation
             caller_phone = None
             for attr in ['caller_phone_number', 'phone_number', 'from_phone_number', 'twilio_from']:
-                if hasattr(full_conv, attr):
-                    val = getattr(full_conv, attr)
-                    if val:
-                        caller_phone = str(val).strip()
-                        break
+                val = getattr(full_conv, attr, None)
+                if val:
+                    caller_phone = str(val).strip()
+                    break
             
             # Check metadata for phone number
-            if not caller_phone and hasattr(full_conv, 'metadata'):
+            if not caller_phone:
                 try:
-                    metadata = full_conv.metadata
+                    metadata = _metadata(full_conv)
                     if isinstance(metadata, dict):
                         phone_call = metadata.get('phone_call', {})
                         if isinstance(phone_call, dict):
@@ -242,43 +314,66 @@ def find_elevenlabs_conversation_by_call_sid(twilio_call_sid: str, phone_number:
                 except:
                     pass
             
-            # Normalize phone numbers for comparison
-            def normalize_phone(phone):
-                return ''.join(c for c in str(phone) if c.isdigit())
-            
             if caller_phone:
-                caller_digits = normalize_phone(caller_phone)
-                search_digits = normalize_phone(phone_number)
-                
                 # Check if phone numbers match (last 10 digits)
-                if caller_digits[-10:] == search_digits[-10:]:
+                if normalize_phone(str(caller_phone))[-10:] == search_digits:
                     # Check if timestamp is close (within 5 minutes)
                     conv_timestamp = None
                     for attr in ['created_at', 'timestamp', 'started_at']:
-                        if hasattr(full_conv, attr):
+                        try:
                             conv_timestamp = getattr(full_conv, attr)
                             break
+                        except AttributeError:
+                            continue
                     
-                    if conv_timestamp:
-                        try:
-                            # Parse timestamp
-                            if isinstance(conv_timestamp, str):
-                                conv_dt = datetime.fromisoformat(conv_timestamp.replace('Z', '+00:00'))
-                            else:
-                                conv_dt = conv_timestamp
-                            
-                            # Compare timestamps (within 5 minutes)
-                            time_diff = abs((conv_dt - call_timestamp).total_seconds())
-                            if time_diff < 300:  # 5 minutes
-                                return {
-                                    "conversation_id": conv_id,
-                                    "conversation": full_conv,
-                                    "match_method": "phone_and_timestamp",
-                                    "phone_match": True,
-                                    "time_diff_seconds": time_diff
-                                }
-                        except:
-                            pass
+                    conv_time = to_epoch_seconds(conv_timestamp)
+                    if conv_time is not None:
+                        # Compare timestamps (within 5 minutes)
+                        time_diff = abs(conv_time - call_time)
+                        if time_diff < MATCH_WINDOW_SECONDS:
+                            return {
+                                "conversation_id": conv_id,
+                                "conversation": full_conv,
+                                "match_method": "phone_and_timestamp",
+                                "phone_match": True,
+                                "time_diff_seconds": time_diff
+                            }
+        
+        return None
+    
+    # Each check needs its own ElevenLabs round-trip, so run them concurrently in batches. Results
+    # are taken in list order and an exact call SID match in a batch wins over a phone/time match,
+    # so the answer doesn't depend on which request finishes first
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        checked = 0
+        id_attr = None
+        while True:
+            try:
+                batch = list(itertools.islice(conversations, FETCH_WORKERS))
+            except Exception as e:
+                raise Exception(f"Error listing ElevenLabs conversations: {e}")
+            if not batch:
+                break
+            if id_attr is None:
+                # Every listed conversation has the same shape, so find the ID attribute once
+                id_attr = next((a for a in ('conversation_id', 'id', 'conversation_uuid') if hasattr(batch[0], a)), None)
+            results = [
+                result for result in executor.map(match_conversation, range(checked + 1, checked + len(batch) + 1), batch)
+                if result
+            ]
+            checked += len(batch)
+            
+            sid_match = next((r for r in results if r["match_method"] == "twilio_call_sid"), None)
+            if sid_match:
+                # Remember the match so the next lookup for this call is a single query
+                try:
+                    elevenlabs_index.record(twilio_call_sid, sid_match["conversation_id"])
+                except Exception as e:
+                    if debug:
+                        print(f"  Could not update conversation index: {e}")
+                return sid_match
+            if results:
+                return results[0]
     
     return None
 
@@ -309,9 +404,18 @@ def main():
         print(f"Finding ElevenLabs conversation for Twilio call: {args.call_sid}")
         print("=" * 60)
         
-        # Get Twilio call details
+        try:
+            elevenlabs_client = ElevenLabsClient()
+        except Exception as e:
+            raise ValueError(f"Error initializing ElevenLabs client: {e}")
+        
+        # Fetch the Twilio call while the conversation index syncs - neither depends on the other
         print("\n📞 Fetching Twilio call details...")
-        twilio_call = get_twilio_call_details(args.call_sid)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            index_future = executor.submit(sync_conversation_index, elevenlabs_client, args.debug)
+            twilio_future = executor.submit(get_twilio_call_details, args.call_sid)
+            twilio_call = twilio_future.result()
+            index_future.result()
         
         print(f"✓ Found Twilio call:")
         print(f"  From: {twilio_call['from']}")
@@ -346,7 +450,9 @@ def main():
             args.call_sid,
             phone_number=search_phone,
             call_timestamp=call_timestamp,
-            debug=args.debug
+            debug=args.debug,
+            elevenlabs_client=elevenlabs_client,
+            index_synced=True
         )
         
         if not result:
@@ -367,8 +473,12 @@ def main():
             conv = result['conversation']
             print(f"\n📋 Conversation Details:")
             
-            # Show available attributes
-            attrs = [a for a in dir(conv) if not a.startswith('_')]
+            # Show available attributes (the model's declared fields, rather than everything dir() finds)
+            model_fields = getattr(type(conv), 'model_fields', None)
+            if model_fields is not None:
+                attrs = list(model_fields.keys())
+            else:
+                attrs = [a for a in dir(conv) if not a.startswith('_')]
             print(f"  Available attributes: {len(attrs)}")
             
             # Show key attributes
@@ -379,7 +489,6 @@ def main():
             
             # Try to get transcription
             try:
-                elevenlabs_client = ElevenLabsClient()
                 transcription = elevenlabs_client.get_transcription(result['conversation_id'])
                 if transcription:
                     print(f"\n📝 Transcription:")
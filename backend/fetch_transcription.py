@@ -3,32 +3,149 @@ Script to fetch the latest conversation transcription from ElevenLabs based on t
 """
 import os
 import sys
-import re
+import argparse
+import time
+import orjson
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
 from dotenv import load_dotenv
-from src.elevenlabs_client import ElevenLabsClient
+from src.elevenlabs_client import ElevenLabsClient, is_conversation_final
+from src.phone_utils import format_phone_number
 
 load_dotenv()
 
+CACHE_DIR = Path(os.getenv('JOURNALAI_CACHE_DIR', Path.home() / '.cache' / 'journalai'))
 
-def format_phone_number(phone: str) -> str:
-    """Format phone number to E.164 format."""
-    # Remove all non-digit characters except +
-    cleaned = re.sub(r'[^\d+]', '', phone)
+# Transcriptions of finished conversations never change, so they are kept indefinitely
+TRANSCRIPTION_CACHE_DIR = CACHE_DIR / 'transcriptions'
+
+# The latest conversation for a number is reused for back-to-back runs
+LATEST_CONVERSATION_CACHE_DIR = CACHE_DIR / 'latest_conversations'
+LATEST_CONVERSATION_CACHE_TTL_SECONDS = 60
+_LATEST_CONVERSATION_FIELDS = ('conversation_id', 'id', 'conversation_uuid', 'created_at', 'timestamp', 'status', 'duration')
+
+# Substrings of JSON keys that may hold a phone number
+_PHONE_KEY_WORDS = ('phone', 'caller', 'from', 'to')
+
+
+def find_phone_keys(root) -> list:
+    """
+    Find phone-related keys anywhere in a decoded JSON document.
     
-    # If it doesn't start with +, assume US number and add +1
-    if not cleaned.startswith('+'):
-        if len(cleaned) == 10:
-            cleaned = '+1' + cleaned
-        elif len(cleaned) == 11 and cleaned[0] == '1':
-            cleaned = '+' + cleaned
-        else:
-            cleaned = '+1' + cleaned
+    Args:
+        root: Decoded JSON (dicts and lists)
     
-    return cleaned
+    Returns:
+        List of "path.key: value" strings
+    """
+    results = []
+    stack = deque([("", root)])
+    while stack:
+        path, obj = stack.pop()
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                lk = k.lower()
+                if any(word in lk for word in _PHONE_KEY_WORDS):
+                    results.append(f"{path}.{k}: {v}")
+                if isinstance(v, (dict, list)):
+                    stack.append((f"{path}.{k}" if path else k, v))
+        elif isinstance(obj, list):
+            for i, item in enumerate(obj):
+                stack.append((f"{path}[{i}]" if path else f"[{i}]", item))
+    return results
+
+
+def _write_cache_file(path: Path, data: bytes):
+    """Write a cache file atomically, ignoring errors (the cache is only an optimization)."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def get_latest_conversation_cached(elevenlabs_client: ElevenLabsClient, phone_number: str) -> tuple:
+    """
+    Get the latest conversation for a phone number, reusing a lookup from the last minute.
+    
+    Args:
+        elevenlabs_client: Client used on a cache miss
+        phone_number: Phone number in E.164 format
+    
+    Returns:
+        (conversation or None, list of conversations searched or None if served from the cache).
+        A cached conversation only has the fields this script reads (_LATEST_CONVERSATION_FIELDS).
+    """
+    cache_path = LATEST_CONVERSATION_CACHE_DIR / f"{phone_number.lstrip('+')}.json"
+    try:
+        if time.time() - cache_path.stat().st_mtime < LATEST_CONVERSATION_CACHE_TTL_SECONDS:
+            return SimpleNamespace(**orjson.loads(cache_path.read_bytes())), None
+    except FileNotFoundError:
+        pass
+    except Exception:
+        # Unreadable entry - drop it and look the conversation up again
+        cache_path.unlink(missing_ok=True)
+    
+    conversation, scanned = elevenlabs_client.get_latest_conversation_by_phone_number(phone_number, return_scanned=True)
+    if conversation:
+        fields = {}
+        for field in _LATEST_CONVERSATION_FIELDS:
+            if hasattr(conversation, field):
+                value = getattr(conversation, field)
+                # Store enums (e.g. status) as their plain value
+                fields[field] = getattr(value, 'value', value)
+        try:
+            _write_cache_file(cache_path, orjson.dumps(fields, default=str))
+        except TypeError:
+            pass
+    return conversation, scanned
+
+
+def get_transcription_cached(elevenlabs_client: ElevenLabsClient, conversation_id: str, final: bool) -> str:
+    """
+    Get a conversation's transcription, using the on-disk cache when possible.
+    
+    Args:
+        elevenlabs_client: Client used on a cache miss
+        conversation_id: ElevenLabs conversation ID
+        final: Whether the conversation has finished; only finished transcriptions are cached
+    
+    Returns:
+        Transcription text, or None if not available
+    """
+    cache_path = TRANSCRIPTION_CACHE_DIR / f"{conversation_id}.json"
+    try:
+        return orjson.loads(cache_path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    
+    transcription = elevenlabs_client.get_transcription(conversation_id)
+    if transcription and final:
+        _write_cache_file(cache_path, orjson.dumps(transcription))
+    return transcription
 
 
 def main():
     """Main function to fetch the latest transcription."""
+    parser = argparse.ArgumentParser(
+        description="Fetch the latest ElevenLabs conversation transcription for a caller phone number"
+    )
+    parser.add_argument(
+        "phone_number",
+        nargs="?",
+        help="Caller phone number (prompted for if omitted)"
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="If no conversation is found, list recent conversations and their phone numbers"
+    )
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("ElevenLabs Transcription Fetcher")
     print("=" * 60)
@@ -42,15 +159,15 @@ def main():
         sys.exit(1)
     
     # Get phone number from user (command line argument or prompt)
-    if len(sys.argv) > 1:
-        caller_number = sys.argv[1].strip()
+    if args.phone_number:
+        caller_number = args.phone_number.strip()
         print(f"\n📞 Using phone number from command line: {caller_number}")
     else:
         caller_number = input("\nEnter the caller phone number (e.g., +1234567890 or 2345678901): ").strip()
     
     if not caller_number:
         print("❌ Phone number is required!")
-        print("Usage: python fetch_transcription.py [+1234567890]")
+        print("Usage: python fetch_transcription.py [+1234567890] [--debug]")
         sys.exit(1)
     
     # Format phone number
@@ -64,148 +181,166 @@ def main():
     # Get the latest conversation for this phone number
     print("\n🔍 Searching for latest conversation...")
     try:
-        conversation = elevenlabs_client.get_latest_conversation_by_phone_number(formatted_number)
+        conversation, scanned_conversations = get_latest_conversation_cached(elevenlabs_client, formatted_number)
         
         if not conversation:
             print(f"❌ No conversations found for phone number: {formatted_number}")
-            print("\n🔍 Debug: Listing available conversations to check phone number formats...")
-            try:
-                all_conversations = elevenlabs_client.list_conversations(limit=5)  # Limit to 5 to avoid too many API calls
-                print(f"\nFound {len(all_conversations)} recent conversations. Fetching full details...")
-                for i, conv in enumerate(all_conversations[:5], 1):
-                    # Get conversation ID
-                    conv_id = getattr(conv, 'conversation_id', None) or getattr(conv, 'id', None) or getattr(conv, 'conversation_uuid', 'Unknown')
+            if not args.debug:
+                print("\n   (Run with --debug to list recent conversations and their phone numbers)")
+            else:
+                print("\n🔍 Debug: Listing available conversations to check phone number formats...")
+                try:
+                    # Reuse the conversations the search already listed; limit to 5 to avoid too many API calls
+                    if scanned_conversations is not None:
+                        all_conversations = list(scanned_conversations[:5])
+                    else:
+                        all_conversations = elevenlabs_client.list_conversations(limit=5)
+                    print(f"\nFound {len(all_conversations)} recent conversations. Fetching full details...")
                     
-                    print(f"\n  Conversation {i}:")
-                    print(f"    ID: {conv_id}")
+                    # Get conversation IDs
+                    recent_conversations = all_conversations[:5]
+                    conv_ids = [
+                        getattr(conv, 'conversation_id', None) or getattr(conv, 'id', None) or getattr(conv, 'conversation_uuid', 'Unknown')
+                        for conv in recent_conversations
+                    ]
                     
-                    # Try to get full conversation details
-                    try:
-                        full_conv = elevenlabs_client.get_conversation(conv_id)
-                        print(f"    ✓ Fetched full details")
-                        
-                        # Try to extract phone number from various attributes
-                        phone_attrs = {}
-                        phone_attrs_to_check = ['caller_phone_number', 'phone_number', 'caller', 'from', 'from_phone_number', 'to_phone_number', 'twilio_from', 'twilio_to']
+                    # Fetch all full conversation details concurrently, keeping any error for its entry
+                    def fetch_full_conversation(conv_id):
+                        try:
+                            return elevenlabs_client.get_conversation(conv_id), None
+                        except Exception as e:
+                            return None, e
+                    
+                    with ThreadPoolExecutor(max_workers=5) as executor:
+                        full_convs = list(executor.map(fetch_full_conversation, conv_ids))
+                    
+                    for i, (conv, conv_id, (full_conv, fetch_error)) in enumerate(zip(recent_conversations, conv_ids, full_convs), 1):
+                        # Collect each conversation's report and write it in one go
+                        lines = []
+                        lines.append(f"\n  Conversation {i}:")
+                        lines.append(f"    ID: {conv_id}")
                         
-                        for attr in phone_attrs_to_check:
-                            if hasattr(full_conv, attr):
-                                val = getattr(full_conv, attr)
+                        # Report the full conversation details fetched above
+                        try:
+                            if fetch_error:
+                                raise fetch_error
+                            lines.append(f"    ✓ Fetched full details")
+                            
+                            # Try to extract phone number from various attributes
+                            phone_attrs = {}
+                            phone_attrs_to_check = ['caller_phone_number', 'phone_number', 'caller', 'from', 'from_phone_number', 'to_phone_number', 'twilio_from', 'twilio_to']
+                            
+                            # Snapshot the conversation's fields once, then use plain dict lookups
+                            if hasattr(full_conv, 'model_dump'):
+                                snap = full_conv.model_dump()
+                            else:
+                                snap = {a: getattr(full_conv, a, None) for a in dir(full_conv) if not a.startswith('_')}
+                            
+                            for attr in phone_attrs_to_check:
+                                val = snap.get(attr)
                                 if isinstance(val, str) and val:
                                     phone_attrs[attr] = val
+                                elif isinstance(val, dict) and val.get('phone_number'):
+                                    phone_attrs[f"{attr}.phone_number"] = val['phone_number']
                                 elif hasattr(val, 'phone_number'):
                                     phone_attrs[f"{attr}.phone_number"] = val.phone_number
-                        
-                        # Check metadata
-                        if hasattr(full_conv, 'metadata'):
-                            if isinstance(full_conv.metadata, dict):
+                            
+                            # Check metadata
+                            metadata = snap.get('metadata')
+                            if metadata is not None and not isinstance(metadata, dict):
+                                metadata = vars(metadata) if hasattr(metadata, '__dict__') else {}
+                            if metadata:
                                 for key in ['phone_number', 'caller_phone_number', 'from', 'to']:
-                                    if key in full_conv.metadata and full_conv.metadata[key]:
-                                        phone_attrs[f"metadata.{key}"] = full_conv.metadata[key]
-                            else:
-                                for attr in ['phone_number', 'caller_phone_number']:
-                                    if hasattr(full_conv.metadata, attr):
-                                        phone_attrs[f"metadata.{attr}"] = getattr(full_conv.metadata, attr)
-                        
-                        # Show all non-private attributes for debugging
-                        all_attrs = [a for a in dir(full_conv) if not a.startswith('_')]
-                        print(f"    All attributes ({len(all_attrs)}): {', '.join(all_attrs[:20])}")
-                        if len(all_attrs) > 20:
-                            print(f"    ... and {len(all_attrs) - 20} more")
-                        
-                        if phone_attrs:
-                            print(f"    Phone numbers found:")
-                            for key, value in phone_attrs.items():
-                                print(f"      {key}: {value}")
-                        else:
-                            print(f"    ⚠️  No phone number found in any standard attribute")
+                                    if metadata.get(key):
+                                        phone_attrs[f"metadata.{key}"] = metadata[key]
                             
-                            # Deep inspect metadata and conversation_initiation_client_data
-                            print(f"    Inspecting metadata and conversation_initiation_client_data...")
-                            if hasattr(full_conv, 'metadata') and full_conv.metadata:
-                                try:
-                                    if isinstance(full_conv.metadata, dict):
-                                        print(f"      metadata (dict): {full_conv.metadata}")
-                                    else:
-                                        # Try to convert to dict
-                                        if hasattr(full_conv.metadata, 'dict'):
-                                            print(f"      metadata (dict()): {full_conv.metadata.dict()}")
-                                        elif hasattr(full_conv.metadata, 'model_dump'):
-                                            print(f"      metadata (model_dump()): {full_conv.metadata.model_dump()}")
-                                        else:
-                                            print(f"      metadata (str): {str(full_conv.metadata)}")
-                                except Exception as e:
-                                    print(f"      metadata inspection error: {e}")
+                            # Show all non-private attributes for debugging
+                            all_attrs = list(snap)
+                            lines.append(f"    All attributes ({len(all_attrs)}): {', '.join(all_attrs[:20])}")
+                            if len(all_attrs) > 20:
+                                lines.append(f"    ... and {len(all_attrs) - 20} more")
                             
-                            if hasattr(full_conv, 'conversation_initiation_client_data') and full_conv.conversation_initiation_client_data:
-                                try:
-                                    if isinstance(full_conv.conversation_initiation_client_data, dict):
-                                        print(f"      conversation_initiation_client_data (dict): {full_conv.conversation_initiation_client_data}")
-                                    else:
-                                        if hasattr(full_conv.conversation_initiation_client_data, 'dict'):
-                                            print(f"      conversation_initiation_client_data (dict()): {full_conv.conversation_initiation_client_data.dict()}")
-                                        elif hasattr(full_conv.conversation_initiation_client_data, 'model_dump'):
-                                            print(f"      conversation_initiation_client_data (model_dump()): {full_conv.conversation_initiation_client_data.model_dump()}")
+                            if phone_attrs:
+                                lines.append(f"    Phone numbers found:")
+                                for key, value in phone_attrs.items():
+                                    lines.append(f"      {key}: {value}")
+                            else:
+                                lines.append(f"    ⚠️  No phone number found in any standard attribute")
+                                
+                                # Deep inspect metadata and conversation_initiation_client_data
+                                lines.append(f"    Inspecting metadata and conversation_initiation_client_data...")
+                                if hasattr(full_conv, 'metadata') and full_conv.metadata:
+                                    try:
+                                        if isinstance(full_conv.metadata, dict):
+                                            lines.append(f"      metadata (dict): {full_conv.metadata}")
                                         else:
-                                            print(f"      conversation_initiation_client_data (str): {str(full_conv.conversation_initiation_client_data)}")
-                                except Exception as e:
-                                    print(f"      conversation_initiation_client_data inspection error: {e}")
-                            
-                            # Try to get JSON representation
-                            try:
-                                if hasattr(full_conv, 'model_dump_json'):
-                                    import json
-                                    conv_json = json.loads(full_conv.model_dump_json())
-                                    # Look for phone-related keys recursively
-                                    def find_phone_keys(obj, path=""):
-                                        results = []
-                                        if isinstance(obj, dict):
-                                            for k, v in obj.items():
-                                                if 'phone' in k.lower() or 'caller' in k.lower() or 'from' in k.lower() or 'to' in k.lower():
-                                                    results.append(f"{path}.{k}: {v}")
-                                                if isinstance(v, (dict, list)):
-                                                    results.extend(find_phone_keys(v, f"{path}.{k}" if path else k))
-                                        elif isinstance(obj, list):
-                                            for i, item in enumerate(obj):
-                                                results.extend(find_phone_keys(item, f"{path}[{i}]" if path else f"[{i}]"))
-                                        return results
-                                    
-                                    phone_matches = find_phone_keys(conv_json)
-                                    if phone_matches:
-                                        print(f"    Found phone-related keys in JSON:")
-                                        for match in phone_matches:
-                                            print(f"      {match}")
-                            except Exception as json_e:
-                                pass
-                            
-                            # Show a few key attributes for debugging
-                            key_attrs = ['direction', 'caller', 'from', 'to', 'twilio_from', 'twilio_to', 'phone_number_id']
-                            for attr in key_attrs:
-                                if hasattr(full_conv, attr):
-                                    val = getattr(full_conv, attr)
-                                    if val:
-                                        print(f"      {attr}: {val}")
-                    except Exception as fetch_e:
-                        print(f"    ❌ Could not fetch full details: {fetch_e}")
-                        # Fall back to basic info
-                        phone_attrs = {}
-                        for attr in ['caller_phone_number', 'phone_number', 'caller']:
-                            if hasattr(conv, attr):
-                                val = getattr(conv, attr)
-                                if isinstance(val, str):
-                                    phone_attrs[attr] = val
-                                elif hasattr(val, 'phone_number'):
-                                    phone_attrs[attr] = val.phone_number
-                        if phone_attrs:
-                            for key, value in phone_attrs.items():
-                                print(f"    {key}: {value}")
-                    
-                    if hasattr(conv, 'created_at'):
-                        print(f"    Created: {conv.created_at}")
-                    elif hasattr(conv, 'timestamp'):
-                        print(f"    Timestamp: {conv.timestamp}")
-            except Exception as debug_e:
-                print(f"  Could not list conversations for debugging: {debug_e}")
+                                            # Try to convert to dict
+                                            if hasattr(full_conv.metadata, 'dict'):
+                                                lines.append(f"      metadata (dict()): {full_conv.metadata.dict()}")
+                                            elif hasattr(full_conv.metadata, 'model_dump'):
+                                                lines.append(f"      metadata (model_dump()): {full_conv.metadata.model_dump()}")
+                                            else:
+                                                lines.append(f"      metadata (str): {str(full_conv.metadata)}")
+                                    except Exception as e:
+                                        lines.append(f"      metadata inspection error: {e}")
+                                
+                                if hasattr(full_conv, 'conversation_initiation_client_data') and full_conv.conversation_initiation_client_data:
+                                    try:
+                                        if isinstance(full_conv.conversation_initiation_client_data, dict):
+                                            lines.append(f"      conversation_initiation_client_data (dict): {full_conv.conversation_initiation_client_data}")
+                                        else:
+                                            if hasattr(full_conv.conversation_initiation_client_data, 'dict'):
+                                                lines.append(f"      conversation_initiation_client_data (dict()): {full_conv.conversation_initiation_client_data.dict()}")
+                                            elif hasattr(full_conv.conversation_initiation_client_data, 'model_dump'):
+                                                lines.append(f"      conversation_initiation_client_data (model_dump()): {full_conv.conversation_initiation_client_data.model_dump()}")
+                                            else:
+                                                lines.append(f"      conversation_initiation_client_data (str): {str(full_conv.conversation_initiation_client_data)}")
+                                    except Exception as e:
+                                        lines.append(f"      conversation_initiation_client_data inspection error: {e}")
+                                
+                                # Try to get JSON representation
+                                try:
+                                    if hasattr(full_conv, 'model_dump_json'):
+                                        # The snapshot taken above is already the model_dump() dict
+                                        conv_json = snap if hasattr(full_conv, 'model_dump') else orjson.loads(full_conv.model_dump_json())
+                                        # Look for phone-related keys throughout the conversation
+                                        phone_matches = find_phone_keys(conv_json)
+                                        if phone_matches:
+                                            lines.append(f"    Found phone-related keys in JSON:")
+                                            lines.extend(f"      {match}" for match in phone_matches)
+                                except Exception as json_e:
+                                    pass
+                                
+                                # Show a few key attributes for debugging
+                                key_attrs = ['direction', 'caller', 'from', 'to', 'twilio_from', 'twilio_to', 'phone_number_id']
+                                for attr in key_attrs:
+                                    if hasattr(full_conv, attr):
+                                        val = getattr(full_conv, attr)
+                                        if val:
+                                            lines.append(f"      {attr}: {val}")
+                        except Exception as fetch_e:
+                            lines.append(f"    ❌ Could not fetch full details: {fetch_e}")
+                            # Fall back to basic info
+                            phone_attrs = {}
+                            for attr in ['caller_phone_number', 'phone_number', 'caller']:
+                                if hasattr(conv, attr):
+                                    val = getattr(conv, attr)
+                                    if isinstance(val, str):
+                                        phone_attrs[attr] = val
+                                    elif hasattr(val, 'phone_number'):
+                                        phone_attrs[attr] = val.phone_number
+                            if phone_attrs:
+                                for key, value in phone_attrs.items():
+                                    lines.append(f"    {key}: {value}")
+                        
+                        if hasattr(conv, 'created_at'):
+                            lines.append(f"    Created: {conv.created_at}")
+                        elif hasattr(conv, 'timestamp'):
+                            lines.append(f"    Timestamp: {conv.timestamp}")
+                        
+                        sys.stdout.write("\n".join(lines) + "\n")
+                except Exception as debug_e:
+                    print(f"  Could not list conversations for debugging: {debug_e}")
             
             print(f"\n💡 Tip: Try searching with different phone number formats:")
             print(f"   - With +1: {formatted_number}")
@@ -230,7 +365,9 @@ def main():
         
         # Get transcription
         print("\n📝 Fetching transcription...")
-        transcription = elevenlabs_client.get_transcription(conversation_id)
+        transcription = get_transcription_cached(
+            elevenlabs_client, conversation_id, final=is_conversation_final(conversation)
+        )
         
         if not transcription:
             print("⚠️  No transcription available for this conversation")
@@ -3,32 +3,41 @@ Fetch Twilio call SIDs for a given phone number via Twilio API.
 """
 import os
 import sys
-import re
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from src.twilio_client import TwilioClient
+from src.phone_utils import format_phone_number
 
 load_dotenv()
 
 
-def format_phone_number(phone: str) -> str:
-    """Format phone number to E.164 format."""
-    # Remove all non-digit characters except +
-    cleaned = re.sub(r'[^\d+]', '', phone)
-    
-    # If it doesn't start with +, assume US number and add +1
-    if not cleaned.startswith('+'):
-        if len(cleaned) == 10:
-            cleaned = '+1' + cleaned
-        elif len(cleaned) == 11 and cleaned[0] == '1':
-            cleaned = '+' + cleaned
-        else:
-            cleaned = '+1' + cleaned
-    
-    return cleaned
+def _call_summary(call, direction: str) -> dict:
+    """Fields shown in the one-line listing."""
+    return {
+        "sid": call.sid,
+        "direction": direction,
+        "status": call.status,
+        "date_created": call.date_created
+    }
+
 
+def _call_detail(call, direction: str) -> dict:
+    """All fields for a call."""
+    call_from = getattr(call, 'from_', getattr(call, 'from_formatted', 'N/A'))
+    return {
+        "sid": call.sid,
+        "direction": direction,
+        "from": call_from,
+        "to": call.to,
+        "status": call.status,
+        "duration": call.duration,
+        "date_created": call.date_created,
+        "date_updated": call.date_updated
+    }
 
-def fetch_call_sids(phone_number: str, search_direction: str = "both", limit: int = None) -> list:
+
+def fetch_call_sids(phone_number: str, search_direction: str = "both", limit: int = None, include_details: bool = True) -> list:
     """
     Fetch all call SIDs for a given phone number.
     
@@ -36,6 +45,7 @@ def fetch_call_sids(phone_number: str, search_direction: str = "both", limit: in
         phone_number: Phone number in E.164 format (e.g., +15551234567)
         search_direction: Which direction to search - "to", "from", or "both" (default: "both")
         limit: Maximum number of calls to return (default: None, returns all)
+        include_details: If False, each call only has sid, direction, status and date_created
     
     Returns:
         List of call SIDs with details
@@ -45,53 +55,36 @@ def fetch_call_sids(phone_number: str, search_direction: str = "both", limit: in
     except Exception as e:
         raise ValueError(f"Error initializing Twilio client: {e}")
     
-    call_sids = []
+    # Calls keyed by SID, so a call that appears in both lists is only kept once
+    call_by_sid = {}
+    
+    build_call = _call_detail if include_details else _call_summary
+    
+    def add_calls(calls, direction):
+        for call in calls:
+            if call.sid not in call_by_sid:
+                call_by_sid[call.sid] = build_call(call, direction)
     
     try:
-        # Search calls where the phone number is the recipient (to)
-        if search_direction in ["to", "both"]:
-            calls_to = client.client.calls.list(to=phone_number, limit=limit)
-            for call in calls_to:
-                call_from = getattr(call, 'from_', getattr(call, 'from_formatted', 'N/A'))
-                call_sids.append({
-                    "sid": call.sid,
-                    "direction": "to",
-                    "from": call_from,
-                    "to": call.to,
-                    "status": call.status,
-                    "duration": call.duration,
-                    "date_created": call.date_created,
-                    "date_updated": call.date_updated
-                })
-        
-        # Search calls where the phone number is the caller (from)
-        if search_direction in ["from", "both"]:
-            calls_from = client.client.calls.list(from_=phone_number, limit=limit)
-            for call in calls_from:
-                call_from = getattr(call, 'from_', getattr(call, 'from_formatted', 'N/A'))
-                call_sids.append({
-                    "sid": call.sid,
-                    "direction": "from",
-                    "from": call_from,
-                    "to": call.to,
-                    "status": call.status,
-                    "duration": call.duration,
-                    "date_created": call.date_created,
-                    "date_updated": call.date_updated
-                })
-        
-        # Remove duplicates (in case a call appears in both lists)
-        seen_sids = set()
-        unique_calls = []
-        for call in call_sids:
-            if call["sid"] not in seen_sids:
-                seen_sids.add(call["sid"])
-                unique_calls.append(call)
+        # The "to" and "from" searches are independent, so run them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Search calls where the phone number is the recipient (to)
+            to_future = None
+            if search_direction in ["to", "both"]:
+                to_future = executor.submit(client.client.calls.list, to=phone_number, limit=limit)
+            
+            # Search calls where the phone number is the caller (from)
+            from_future = None
+            if search_direction in ["from", "both"]:
+                from_future = executor.submit(client.client.calls.list, from_=phone_number, limit=limit)
+            
+            if to_future:
+                add_calls(to_future.result(), "to")
+            if from_future:
+                add_calls(from_future.result(), "from")
         
         # Sort by date_created (most recent first)
-        unique_calls.sort(key=lambda x: x["date_created"], reverse=True)
-        
-        return unique_calls
+        return sorted(call_by_sid.values(), key=lambda x: x["date_created"], reverse=True)
         
     except Exception as e:
         raise Exception(f"Error fetching calls from Twilio API: {e}")
@@ -133,7 +126,7 @@ def main():
         print("=" * 60)
         
         # Fetch call SIDs
-        calls = fetch_call_sids(formatted_phone, args.direction, args.limit)
+        calls = fetch_call_sids(formatted_phone, args.direction, args.limit, include_details=args.details)
         
         if not calls:
             print(f"\nNo calls found for {formatted_phone}")
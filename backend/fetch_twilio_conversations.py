@@ -3,36 +3,42 @@ Fetch Twilio conversation IDs for a given phone number via Twilio Conversations
 """
 import os
 import sys
-import re
 import argparse
-from dotenv import load_dotenv
-import requests
-from requests.auth import HTTPBasicAuth
-from urllib.parse import urlencode
+import functools
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from src.phone_utils import format_phone_number
 
-load_dotenv()
+# requests and dotenv are imported on first use, so importing this module (e.g. for
+# format_phone_number) stays cheap
+_dotenv_loaded = False
 
-# Environment variables: TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_SERVICE_SID
-ACCT = os.getenv("TWILIO_ACCOUNT_SID", "").strip()
-TOKEN = os.getenv("TWILIO_AUTH_TOKEN", "").strip()
-SERVICE_SID = os.getenv("TWILIO_SERVICE_SID", "").strip()
 
+def _ensure_env():
+    """Load .env the first time credentials are needed."""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
 
-def format_phone_number(phone: str) -> str:
-    """Format phone number to E.164 format."""
-    # Remove all non-digit characters except +
-    cleaned = re.sub(r'[^\d+]', '', phone)
-    
-    # If it doesn't start with +, assume US number and add +1
-    if not cleaned.startswith('+'):
-        if len(cleaned) == 10:
-            cleaned = '+1' + cleaned
-        elif len(cleaned) == 11 and cleaned[0] == '1':
-            cleaned = '+' + cleaned
-        else:
-            cleaned = '+1' + cleaned
+
+@functools.lru_cache(maxsize=1)
+def _get_session(account_sid: str, auth_token: str):
+    """Return a requests session that keeps the HTTPS connection to conversations.twilio.com alive across pages."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.auth import HTTPBasicAuth
+    from urllib3.util.retry import Retry
     
-    return cleaned
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    ))
+    session.auth = HTTPBasicAuth(account_sid, auth_token)
+    return session
 
 
 def fetch_conversation_ids(phone_number: str) -> list:
@@ -45,40 +51,54 @@ def fetch_conversation_ids(phone_number: str) -> list:
     Returns:
         List of conversation SIDs
     """
-    if not ACCT or not TOKEN:
+    import requests
+    
+    # Environment variables: TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_SERVICE_SID
+    _ensure_env()
+    acct = os.getenv("TWILIO_ACCOUNT_SID", "").strip()
+    token = os.getenv("TWILIO_AUTH_TOKEN", "").strip()
+    service_sid = os.getenv("TWILIO_SERVICE_SID", "").strip()
+    
+    if not acct or not token:
         raise ValueError(
             "Twilio credentials are required. Set TWILIO_ACCOUNT_SID and "
             "TWILIO_AUTH_TOKEN environment variables."
         )
     
-    if not SERVICE_SID:
+    if not service_sid:
         raise ValueError(
             "TWILIO_SERVICE_SID environment variable is required. "
             "This is your Twilio Conversations Service SID (starts with IS...)."
         )
     
     # Base URL for service-scoped ParticipantConversations
-    base_url = f"https://conversations.twilio.com/v1/Services/{SERVICE_SID}/ParticipantConversations"
+    base_url = f"https://conversations.twilio.com/v1/Services/{service_sid}/ParticipantConversations"
+    
+    # Parameters: use Address for SMS/WhatsApp, with the largest page Twilio allows
+    params = {"Address": phone_number, "PageSize": 1000}
+    
+    session = _get_session(acct, token)
     
-    # Parameters: use Address for SMS/WhatsApp
-    params = {"Address": phone_number}
+    def fetch_page(url, page_params):
+        resp = session.get(url, params=page_params, timeout=20)
+        resp.raise_for_status()
+        return orjson.loads(resp.content)
     
     conversation_ids = []
-    next_page_url = None
     
-    while True:
-        # Use next_page_url if available, otherwise use base_url
-        url = next_page_url if next_page_url else base_url
-        
-        try:
-            resp = requests.get(
-                url,
-                auth=HTTPBasicAuth(ACCT, TOKEN),
-                params=params if not next_page_url else None,  # Don't pass params if using next_page_url
-                timeout=20
-            )
-            resp.raise_for_status()
-            data = resp.json()
+    # Request the next page as soon as its URL is known, so it downloads while the current
+    # page is being parsed
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch_page, base_url, params)
+        while future:
+            try:
+                data = future.result()
+            except requests.exceptions.RequestException as e:
+                raise Exception(f"Error fetching conversations from Twilio API: {e}")
+            
+            # Check for pagination (next_page_url already carries the query parameters)
+            next_page_url = data.get("meta", {}).get("next_page_url")
+            future = executor.submit(fetch_page, next_page_url, None) if next_page_url else None
             
             # Extract conversation SIDs from the response
             conversations = data.get("conversations", [])
@@ -86,14 +106,6 @@ def fetch_conversation_ids(phone_number: str) -> list:
                 conversation_sid = item.get("conversationSid")
                 if conversation_sid:
                     conversation_ids.append(conversation_sid)
-            
-            # Check for pagination
-            next_page_url = data.get("meta", {}).get("next_page_url")
-            if not next_page_url:
-                break
-                
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Error fetching conversations from Twilio API: {e}")
     
     return conversation_ids
 
@@ -5,29 +5,36 @@ import os
 import sys
 import re
 import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 from src.twilio_client import TwilioClient
 from src.elevenlabs_client import ElevenLabsClient
+from src.conversation_cache import get_conversation_cached
+from src.phone_utils import format_phone_number
 
 load_dotenv()
 
+# Twilio call records requested per list page (the API maximum)
+TWILIO_PAGE_SIZE = 1000
 
-def format_phone_number(phone: str) -> str:
-    """Format phone number to E.164 format."""
-    # Remove all non-digit characters except +
-    cleaned = re.sub(r'[^\d+]', '', phone)
-    
-    # If it doesn't start with +, assume US number and add +1
-    if not cleaned.startswith('+'):
-        if len(cleaned) == 10:
-            cleaned = '+1' + cleaned
-        elif len(cleaned) == 11 and cleaned[0] == '1':
-            cleaned = '+' + cleaned
-        else:
-            cleaned = '+1' + cleaned
-    
-    return cleaned
+# Concurrent ElevenLabs conversation detail fetches
+DETAIL_FETCH_WORKERS = 16
+
+# Everything except digits, compiled once for the per-conversation phone comparisons
+_NON_DIGIT_RE = re.compile(r'\D')
+
+
+def normalize_phone(phone) -> str:
+    """Normalize phone to digits only for comparison."""
+    return _NON_DIGIT_RE.sub('', str(phone))
+
+
+@functools.lru_cache(maxsize=1)
+def get_twilio_client() -> TwilioClient:
+    """Shared TwilioClient for this process."""
+    return TwilioClient()
 
 
 def get_twilio_call_sids(phone_number: str, search_direction: str = "both") -> list:
@@ -42,24 +49,28 @@ def get_twilio_call_sids(phone_number: str, search_direction: str = "both") -> l
         List of call SIDs (strings)
     """
     try:
-        client = TwilioClient()
+        client = get_twilio_client()
     except Exception as e:
         raise ValueError(f"Error initializing Twilio client: {e}")
     
     call_sids = set()  # Use set to avoid duplicates
     
     try:
-        # Search calls where the phone number is the recipient (to)
-        if search_direction in ["to", "both"]:
-            calls_to = client.client.calls.list(to=phone_number)
-            for call in calls_to:
-                call_sids.add(call.sid)
-        
-        # Search calls where the phone number is the caller (from)
-        if search_direction in ["from", "both"]:
-            calls_from = client.client.calls.list(from_=phone_number)
-            for call in calls_from:
-                call_sids.add(call.sid)
+        # The "to" and "from" searches are independent, so run them concurrently, with the
+        # largest Twilio page size to keep pagination round trips down
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = []
+            
+            # Search calls where the phone number is the recipient (to)
+            if search_direction in ["to", "both"]:
+                futures.append(executor.submit(client.client.calls.list, to=phone_number, page_size=TWILIO_PAGE_SIZE))
+            
+            # Search calls where the phone number is the caller (from)
+            if search_direction in ["from", "both"]:
+                futures.append(executor.submit(client.client.calls.list, from_=phone_number, page_size=TWILIO_PAGE_SIZE))
+            
+            for future in futures:
+                call_sids.update(call.sid for call in future.result())
         
         return list(call_sids)
         
@@ -131,6 +142,9 @@ def find_matching_conversations(phone_number: str, twilio_call_sids: set, debug:
     Returns:
         List of conversation objects with datetime, duration, and conversation_id
     """
+    # Hashed membership checks for every conversation's call SID
+    twilio_call_sids = frozenset(twilio_call_sids)
+    
     try:
         elevenlabs_client = ElevenLabsClient()
     except Exception as e:
@@ -147,17 +161,12 @@ def find_matching_conversations(phone_number: str, twilio_call_sids: set, debug:
     
     matching_conversations = []
     
-    # Normalize phone number for comparison
-    def normalize_phone(phone):
-        """Normalize phone to digits only for comparison."""
-        return re.sub(r'[^\d]', '', str(phone))
-    
     search_digits = normalize_phone(phone_number)
     # If search number starts with +1, also try without the 1
     if phone_number.startswith('+1') and len(search_digits) == 11:
-        search_variations = [search_digits, search_digits[1:]]  # +18603048753 and 8603048753
+        search_variations = (search_digits, search_digits[1:])  # +18603048753 and 8603048753
     else:
-        search_variations = [search_digits]
+        search_variations = (search_digits,)
     
     if debug:
         print(f"   Search variations: {search_variations}")
@@ -165,6 +174,7 @@ def find_matching_conversations(phone_number: str, twilio_call_sids: set, debug:
     
     # Search through conversations
     # Strategy: First check if Twilio call SID matches (more reliable), then verify phone number
+    candidates = []
     for idx, conv in enumerate(conversations, 1):
         conv_id = getattr(conv, 'conversation_id', None) or getattr(conv, 'id', None) or getattr(conv, 'conversation_uuid', None)
         if not conv_id:
@@ -173,12 +183,27 @@ def find_matching_conversations(phone_number: str, twilio_call_sids: set, debug:
         if debug and idx <= 10:
             print(f"   [{idx}] Checking conversation: {conv_id}")
         
-        # Get full conversation details
+        # If the list item already carries a call SID for some other call, skip the detail fetch
+        summary_call_sid = get_elevenlabs_conversation_call_sid(conv)
+        if summary_call_sid and summary_call_sid not in twilio_call_sids:
+            if debug and idx <= 10:
+                print(f"      Twilio call SID: {summary_call_sid} (not ours, skipped)")
+            continue
+        
+        candidates.append((idx, conv, conv_id))
+    
+    # Get full conversation details (finished ones from the disk cache), overlapping the independent requests
+    def fetch_full_conversation(candidate):
+        _, conv, conv_id = candidate
         try:
-            full_conv = elevenlabs_client.get_conversation(conv_id)
+            return get_conversation_cached(elevenlabs_client, conv_id)
         except:
-            full_conv = conv
-        
+            return conv
+    
+    with ThreadPoolExecutor(max_workers=DETAIL_FETCH_WORKERS) as executor:
+        full_convs = list(executor.map(fetch_full_conversation, candidates))
+    
+    for (idx, conv, conv_id), full_conv in zip(candidates, full_convs):
         # FIRST: Extract Twilio call SID from this conversation (more reliable than phone matching)
         twilio_call_sid = get_elevenlabs_conversation_call_sid(full_conv)
         
@@ -289,19 +314,6 @@ def find_matching_conversations(phone_number: str, twilio_call_sids: set, debug:
                     except:
                         pass
                 
-                # If still not found, try to get from Twilio call details (fallback)
-                if not conv_datetime and twilio_call_sid:
-                    try:
-                        twilio_client = TwilioClient()
-                        twilio_call = twilio_client.client.calls(twilio_call_sid).fetch()
-                        # Try start_time first, then date_created
-                        if twilio_call.start_time:
-                            conv_datetime = twilio_call.start_time
-                        elif twilio_call.date_created:
-                            conv_datetime = twilio_call.date_created
-                    except:
-                        pass
-                
                 # Extract duration (length of call)
                 duration = None
                 duration_attrs = ['duration', 'call_duration', 'length', 'call_length']
@@ -333,12 +345,14 @@ def find_matching_conversations(phone_number: str, twilio_call_sids: set, debug:
                     except:
                         pass
                 
-                # If duration not found, try to get from Twilio call details
-                if not duration and twilio_call_sid:
+                # If datetime or duration is still missing, fill both from one Twilio call fetch (fallback)
+                if (not conv_datetime or not duration) and twilio_call_sid:
                     try:
-                        twilio_client = TwilioClient()
-                        twilio_call = twilio_client.client.calls(twilio_call_sid).fetch()
-                        if twilio_call.duration:
+                        # fetch_call serves finished calls from the client's cache
+                        twilio_call = get_twilio_client().fetch_call(twilio_call_sid)
+                        # Try start_time first, then date_created
+                        conv_datetime = conv_datetime or twilio_call.start_time or twilio_call.date_created
+                        if not duration and twilio_call.duration:
                             duration = float(twilio_call.duration)
                     except:
                         pass
@@ -412,7 +426,7 @@ def main():
         
         matching_conversations = find_matching_conversations(
             formatted_phone, 
-            set(twilio_call_sids),
+            twilio_call_sids,
             debug=args.debug
         )
         
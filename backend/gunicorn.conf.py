@@ -0,0 +1,18 @@
+"""
+Gunicorn configuration for running the Journie API in production (Render.com).
+Gunicorn picks this file up automatically when started from the backend directory.
+"""
+import os
+
+# Render.com provides the port to bind to via the PORT env var
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Requests spend most of their time waiting on Gmail/Twilio/ElevenLabs/Postgres,
+# so threaded workers let each process serve many requests concurrently
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', '4'))
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+
+accesslog = '-'
+errorlog = '-'
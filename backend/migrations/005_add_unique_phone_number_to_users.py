@@ -0,0 +1,44 @@
+"""
+Migration: 005_add_unique_phone_number_to_users
+Makes phone_number unique so sign up can rely on the database to reject duplicates.
+"""
+
+def up(conn):
+    """Apply the migration"""
+    cursor = conn.cursor()
+    
+    # The index can't be built while duplicates exist, so list them instead of failing partway
+    cursor.execute("""
+        SELECT phone_number, array_agg(email ORDER BY id)
+        FROM users
+        WHERE phone_number IS NOT NULL
+        GROUP BY phone_number
+        HAVING COUNT(*) > 1
+    """)
+    duplicates = cursor.fetchall()
+    if duplicates:
+        cursor.close()
+        details = "; ".join(f"{phone}: {', '.join(emails)}" for phone, emails in duplicates)
+        raise ValueError(
+            f"Cannot make users.phone_number unique - {len(duplicates)} phone number(s) are shared "
+            f"by several users ({details}). Resolve these duplicates and run the migration again."
+        )
+    
+    # Unique index on phone_number (NULLs are still allowed for users without a phone number)
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_users_phone_number_unique ON users(phone_number)
+    """)
+    
+    # Don't commit here - let the context manager handle it
+    cursor.close()
+
+def down(conn):
+    """Rollback the migration"""
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        DROP INDEX IF EXISTS idx_users_phone_number_unique
+    """)
+    
+    # Don't commit here - let the context manager handle it
+    cursor.close()
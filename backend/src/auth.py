@@ -1,12 +1,24 @@
 import os
 import secrets
 import logging
+import threading
 from datetime import datetime, timedelta
+from cachetools import TTLCache
 from src.db import get_db_connection
-from src.gmail_client import send_email
 
 logger = logging.getLogger(__name__)
 
+# Recently looked-up users by email. Rows rarely change, so profile/conversation polling
+# can skip the database; entries expire after USER_CACHE_TTL_SECONDS (e.g. after an approval change)
+USER_CACHE_TTL_SECONDS = 60
+_user_cache = TTLCache(maxsize=10000, ttl=USER_CACHE_TTL_SECONDS)
+_user_cache_lock = threading.RLock()
+
+def invalidate_user_cache(email):
+    """Drop a cached user so the next lookup reads from the database"""
+    with _user_cache_lock:
+        _user_cache.pop(email, None)
+
 def generate_one_time_code():
     """Generate a random 6-digit one-time code"""
     return ''.join([str(secrets.randbelow(10)) for _ in range(6)])
@@ -59,6 +71,8 @@ The Journie Team
 """
         
         try:
+            # Imported lazily so importing this module doesn't load the email client
+            from src.gmail_client import send_email
             send_email(email, subject, body)
             logger.info(f"Login code sent to {email}")
             return True, "Login code sent to your email"
@@ -126,7 +140,12 @@ def verify_login_code(email, code):
         return False, None
 
 def get_user_by_email(email):
-    """Get user by email (for testing/debugging)"""
+    """Get user by email, served from a short-lived cache when possible"""
+    with _user_cache_lock:
+        cached = _user_cache.get(email)
+    if cached is not None:
+        return dict(cached)
+    
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -155,10 +174,12 @@ def get_user_by_email(email):
                 # Log for debugging
                 logger.info(f"Querying database '{db_name}' - User {email} approval status: {user[5]} (type: {type(user[5])})")
                 cursor.close()
-                return user_dict
+                # Only found users are cached so a new sign up is visible immediately
+                with _user_cache_lock:
+                    _user_cache[email] = user_dict
+                return dict(user_dict)
             cursor.close()
             return None
     except Exception as e:
         logger.error(f"Error getting user: {str(e)}", exc_info=True)
         return None
-
@@ -0,0 +1,61 @@
+"""
+On-disk cache of finished ElevenLabs conversations, shared by the lookup scripts.
+
+Finished conversations never change, so repeated runs load them from disk instead of
+re-fetching them from the ElevenLabs API. Entries are stored as the conversation's
+model_dump() JSON and rebuilt with the SDK model, so nothing executable is ever loaded.
+"""
+import os
+import time
+import orjson
+from pathlib import Path
+from src.elevenlabs_client import is_conversation_final
+
+try:
+    from elevenlabs import GetConversationResponseModel
+except ImportError:
+    # SDK version without the model - conversations are fetched without the disk cache
+    GetConversationResponseModel = None
+
+CONVERSATION_CACHE_DIR = Path(os.getenv('JOURNALAI_CACHE_DIR', Path.home() / '.cache' / 'journalai')) / 'elevenlabs_convs'
+CONVERSATION_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+
+def get_conversation_cached(elevenlabs_client, conversation_id: str):
+    """
+    Get a conversation, using the on-disk cache of finished conversations when possible.
+    
+    Args:
+        elevenlabs_client: ElevenLabsClient used on a cache miss
+        conversation_id: ElevenLabs conversation ID
+    
+    Returns:
+        Conversation object
+    """
+    if GetConversationResponseModel is None:
+        return elevenlabs_client.get_conversation(conversation_id)
+    
+    cache_path = CONVERSATION_CACHE_DIR / f"{conversation_id}.json"
+    try:
+        if time.time() - cache_path.stat().st_mtime < CONVERSATION_CACHE_TTL_SECONDS:
+            return GetConversationResponseModel.model_validate(orjson.loads(cache_path.read_bytes()))
+    except FileNotFoundError:
+        pass
+    except Exception:
+        # Unreadable or stale entry (e.g. written by another SDK version) - drop it and refetch
+        cache_path.unlink(missing_ok=True)
+    
+    conversation = elevenlabs_client.get_conversation(conversation_id)
+    
+    if is_conversation_final(conversation) and hasattr(conversation, 'model_dump'):
+        try:
+            data = orjson.dumps(conversation.model_dump(mode='json', by_alias=True))
+            CONVERSATION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so a concurrent reader never sees a partial file
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, cache_path)
+        except (OSError, TypeError, ValueError):
+            pass
+    
+    return conversation
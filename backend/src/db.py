@@ -1,13 +1,26 @@
 import os
 import psycopg2
 import logging
+import threading
 from psycopg2 import pool
+from psycopg2.extensions import connection as _pg_connection
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
 # Connection pool (will be initialized on first use)
 _connection_pool = None
+_connection_pool_lock = threading.Lock()
+
+# Pool size per process; override with DB_POOL_MIN_CONN / DB_POOL_MAX_CONN
+DB_POOL_MIN_CONN = int(os.getenv('DB_POOL_MIN_CONN', '5'))
+DB_POOL_MAX_CONN = int(os.getenv('DB_POOL_MAX_CONN', '20'))
+
+class PooledConnection(_pg_connection):
+    """Connection that remembers which server-side prepared statements exist in its session"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
 
 def get_db_connection_string():
     """
@@ -40,30 +53,36 @@ def get_db_connection_string():
 def _init_connection_pool():
     """Initialize the connection pool"""
     global _connection_pool
-    if _connection_pool is None:
-        conn_string = get_db_connection_string()
-        try:
-            _connection_pool = psycopg2.pool.SimpleConnectionPool(
-                1,  # min connections
-                10,  # max connections
-                conn_string
-            )
-            logger.info("Database connection pool initialized")
-            
-            # Verify connection by checking database name
+    if _connection_pool is not None:
+        return _connection_pool
+    
+    # Requests are served from multiple threads, so guard creation and use a thread-safe pool
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            conn_string = get_db_connection_string()
             try:
-                test_conn = _connection_pool.getconn()
-                cursor = test_conn.cursor()
-                cursor.execute("SELECT current_database(), current_user;")
-                db_info = cursor.fetchone()
-                cursor.close()
-                _connection_pool.putconn(test_conn)
-                logger.info(f"Connected to database: {db_info[0]}, user: {db_info[1]}")
+                _connection_pool = psycopg2.pool.ThreadedConnectionPool(
+                    DB_POOL_MIN_CONN,
+                    DB_POOL_MAX_CONN,
+                    conn_string,
+                    connection_factory=PooledConnection
+                )
+                logger.info(f"Database connection pool initialized (min={DB_POOL_MIN_CONN}, max={DB_POOL_MAX_CONN})")
+                
+                # Verify connection by checking database name
+                try:
+                    test_conn = _connection_pool.getconn()
+                    cursor = test_conn.cursor()
+                    cursor.execute("SELECT current_database(), current_user;")
+                    db_info = cursor.fetchone()
+                    cursor.close()
+                    _connection_pool.putconn(test_conn)
+                    logger.info(f"Connected to database: {db_info[0]}, user: {db_info[1]}")
+                except Exception as e:
+                    logger.warning(f"Could not verify database connection: {e}")
             except Exception as e:
-                logger.warning(f"Could not verify database connection: {e}")
-        except Exception as e:
-            logger.error(f"Failed to create connection pool: {str(e)}")
-            raise
+                logger.error(f"Failed to create connection pool: {str(e)}")
+                raise
     return _connection_pool
 
 @contextmanager
@@ -87,3 +106,21 @@ def get_db_connection():
         if conn:
             pool.putconn(conn)
 
+def execute_prepared(cursor, name, sql, params):
+    """
+    Run a statement through a server-side prepared statement, so Postgres parses and plans it
+    once per pooled connection rather than on every call.
+    
+    Args:
+        cursor: Cursor on a connection from get_db_connection()
+        name: Statement name, unique per SQL text
+        sql: SQL using $1, $2, ... placeholders
+        params: Parameter values, in placeholder order
+    """
+    conn = cursor.connection
+    if name not in conn.prepared_statements:
+        # Prepared statements belong to the session and survive a transaction rollback
+        cursor.execute(f"PREPARE {name} AS {sql}")
+        conn.prepared_statements.add(name)
+    placeholders = ', '.join(['%s'] * len(params))
+    cursor.execute(f"EXECUTE {name} ({placeholders})", params)
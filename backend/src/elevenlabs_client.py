@@ -2,11 +2,32 @@
 ElevenLabs client for text-to-speech and voice operations.
 """
 import os
+import threading
+import httpx
+from cachetools import LRUCache
 from elevenlabs import ElevenLabs
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Connection pool for the ElevenLabs HTTP client, sized for the concurrent lookups in app.py
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+HTTP_TIMEOUT_SECONDS = 60
+
+# Finished conversations never change, so their details are cached in-process by conversation_id
+FINAL_CONVERSATION_STATUSES = ('done', 'failed')
+_conversation_cache = LRUCache(maxsize=500)
+_conversation_cache_lock = threading.Lock()
+
+
+def is_conversation_final(conversation) -> bool:
+    """Return True if the conversation has finished (and so will not change any more)."""
+    status = getattr(conversation, 'status', None)
+    # The SDK may return the status as an enum or a plain string
+    status = getattr(status, 'value', status)
+    return isinstance(status, str) and status.lower() in FINAL_CONVERSATION_STATUSES
+
 
 class ElevenLabsClient:
     """Client for interacting with ElevenLabs API."""
@@ -22,7 +43,19 @@ class ElevenLabsClient:
         if not self.api_key:
             raise ValueError("ElevenLabs API key is required. Set ELEVENLABS_API_KEY environment variable.")
         
-        self.client = ElevenLabs(api_key=self.api_key)
+        self.client = ElevenLabs(api_key=self.api_key, httpx_client=self._create_http_client())
+    
+    @staticmethod
+    def _create_http_client() -> httpx.Client:
+        """Create an httpx client that keeps a large pool of connections alive and retries failed connects."""
+        transport = httpx.HTTPTransport(
+            retries=2,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+        return httpx.Client(transport=transport, timeout=HTTP_TIMEOUT_SECONDS)
     
     def generate_speech(
         self,
@@ -220,6 +253,41 @@ class ElevenLabsClient:
             print(f"Error listing conversations: {e}")
             raise
     
+    def iter_conversations(self, start_after: int = None, start_before: int = None, page_size: int = 100):
+        """
+        Lazily page through conversations, newest first, within an optional time window.
+        
+        Args:
+            start_after: Only include conversations started at or after this Unix timestamp
+            start_before: Only include conversations started before this Unix timestamp
+            page_size: Number of conversations to request per page
+            
+        Yields:
+            Conversation summary objects
+        """
+        filters = {}
+        if start_after is not None:
+            filters['call_start_after_unix'] = int(start_after)
+        if start_before is not None:
+            filters['call_start_before_unix'] = int(start_before)
+        
+        cursor = None
+        while True:
+            page = self.client.conversational_ai.conversations.list(page_size=page_size, cursor=cursor, **filters)
+            for conv in getattr(page, 'conversations', None) or []:
+                started = getattr(conv, 'start_time_unix_secs', None)
+                if started is not None:
+                    # Results are newest first, so everything after this is older still
+                    if start_after is not None and started < start_after:
+                        return
+                    if start_before is not None and started >= start_before:
+                        continue
+                yield conv
+            
+            cursor = getattr(page, 'next_cursor', None)
+            if not getattr(page, 'has_more', False) or not cursor:
+                return
+    
     def get_conversation(self, conversation_id: str):
         """
         Get details of a specific conversation.
@@ -230,21 +298,34 @@ class ElevenLabsClient:
         Returns:
             Conversation object with details and transcription
         """
+        with _conversation_cache_lock:
+            cached = _conversation_cache.get(conversation_id)
+        if cached is not None:
+            return cached
+        
         try:
-            return self.client.conversational_ai.conversations.get(conversation_id)
+            conversation = self.client.conversational_ai.conversations.get(conversation_id)
         except Exception as e:
             print(f"Error getting conversation: {e}")
             raise
+        
+        if is_conversation_final(conversation):
+            with _conversation_cache_lock:
+                _conversation_cache[conversation_id] = conversation
+        return conversation
     
-    def get_latest_conversation_by_phone_number(self, phone_number: str):
+    def get_latest_conversation_by_phone_number(self, phone_number: str, return_scanned: bool = False):
         """
         Get the latest conversation for a given phone number.
         
         Args:
             phone_number: Phone number in E.164 format (e.g., +1234567890)
+            return_scanned: If True, also return the listed conversations that were searched,
+                so callers can reuse them instead of listing again
             
         Returns:
-            Latest conversation object, or None if not found
+            Latest conversation object, or None if not found. With return_scanned, a
+            (conversation, scanned_conversations) tuple.
         """
         import re
         
@@ -449,7 +530,7 @@ class ElevenLabsClient:
                             break
         
         if not matching_conversations:
-            return None
+            return (None, conversations) if return_scanned else None
         
         # Sort by timestamp (most recent first)
         def get_timestamp(conv):
@@ -465,7 +546,8 @@ class ElevenLabsClient:
         
         matching_conversations.sort(key=get_timestamp, reverse=True)
         
-        return matching_conversations[0] if matching_conversations else None
+        latest = matching_conversations[0] if matching_conversations else None
+        return (latest, conversations) if return_scanned else latest
     
     def get_transcription(self, conversation_id: str):
         """
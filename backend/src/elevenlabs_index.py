@@ -0,0 +1,170 @@
+"""
+Local SQLite index of Twilio call SID -> ElevenLabs conversation ID.
+
+Finding the conversation for a call otherwise means fetching recent conversations one by one
+and checking each for the call SID. The index is synced incrementally (only conversations newer
+than the last sync are fetched), so a lookup becomes a single SELECT.
+"""
+import os
+import sqlite3
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from src.elevenlabs_client import is_conversation_final
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = Path(os.getenv('JOURNALAI_CACHE_DIR', Path.home() / '.cache' / 'journalai')) / 'elevenlabs_index.sqlite3'
+
+# The first sync indexes at most this many of the newest conversations from the last few days;
+# later syncs pick up from there, and older calls fall back to the scan (which records its matches)
+INITIAL_SYNC_DAYS = 3
+INITIAL_SYNC_MAX_CONVERSATIONS = 500
+
+# How long a conversation that failed or wasn't finished keeps holding back the sync mark
+PENDING_RETRY_DAYS = 30
+
+# Concurrent conversation fetches while syncing
+SYNC_WORKERS = 20
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the index database, creating the tables if needed."""
+    INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(INDEX_PATH)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS call_sid_index (
+            twilio_call_sid TEXT PRIMARY KEY,
+            conversation_id TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key TEXT PRIMARY KEY,
+            value REAL NOT NULL
+        )
+    """)
+    return conn
+
+
+def get_call_sid(conversation) -> str:
+    """Extract the Twilio call SID from a full ElevenLabs conversation, or None."""
+    data = conversation.model_dump() if hasattr(conversation, 'model_dump') else conversation
+    try:
+        call_sid = data["conversation_initiation_client_data"]["dynamic_variables"]["system__call_sid"]
+    except (KeyError, TypeError):
+        return None
+    return str(call_sid).strip() if call_sid else None
+
+
+def lookup(twilio_call_sid: str) -> str:
+    """
+    Look up the conversation for a call in the index.
+    
+    Args:
+        twilio_call_sid: Twilio call SID
+    
+    Returns:
+        ElevenLabs conversation ID, or None if the call isn't indexed
+    """
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            "SELECT conversation_id FROM call_sid_index WHERE twilio_call_sid = ?",
+            (twilio_call_sid,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def record(twilio_call_sid: str, conversation_id: str):
+    """
+    Add or update one call SID -> conversation mapping.
+    
+    Args:
+        twilio_call_sid: Twilio call SID
+        conversation_id: ElevenLabs conversation ID
+    """
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO call_sid_index (twilio_call_sid, conversation_id, fetched_at) VALUES (?, ?, ?)",
+            (twilio_call_sid, conversation_id, time.time())
+        )
+
+
+def ensure_index(elevenlabs_client, get_conversation=None) -> int:
+    """
+    Bring the index up to date with conversations started since the last sync.
+    
+    Args:
+        elevenlabs_client: ElevenLabsClient used to list (and fetch) conversations
+        get_conversation: Optional function (client, conversation_id) -> conversation used to
+            fetch details, e.g. a caching wrapper. Defaults to elevenlabs_client.get_conversation.
+    
+    Returns:
+        Number of mappings added
+    """
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT value FROM sync_state WHERE key = 'last_start_time'").fetchone()
+    last_start_time = row[0] if row else time.time() - INITIAL_SYNC_DAYS * 24 * 60 * 60
+    limit = None if row else INITIAL_SYNC_MAX_CONVERSATIONS
+    
+    new_conversations = []
+    for conv in elevenlabs_client.iter_conversations(start_after=last_start_time):
+        conv_id = getattr(conv, 'conversation_id', None)
+        if conv_id:
+            new_conversations.append((conv_id, getattr(conv, 'start_time_unix_secs', None)))
+            if limit and len(new_conversations) >= limit:
+                break
+    
+    if not new_conversations:
+        return 0
+    
+    def fetch_call_sid(conv_id):
+        """Return (call_sid, done); done is False if the conversation should be looked at again next sync."""
+        try:
+            if get_conversation:
+                conversation = get_conversation(elevenlabs_client, conv_id)
+            else:
+                conversation = elevenlabs_client.get_conversation(conv_id)
+        except Exception as e:
+            logger.warning(f"Could not index conversation {conv_id}: {e}")
+            return None, False
+        call_sid = get_call_sid(conversation)
+        # A conversation still in progress may not have its call SID yet
+        return call_sid, bool(call_sid) or is_conversation_final(conversation)
+    
+    with ThreadPoolExecutor(max_workers=SYNC_WORKERS) as executor:
+        fetched = list(executor.map(fetch_call_sid, [conv_id for conv_id, _ in new_conversations]))
+    
+    now = time.time()
+    rows = [
+        (call_sid, conv_id, now)
+        for (conv_id, _), (call_sid, _) in zip(new_conversations, fetched)
+        if call_sid
+    ]
+    
+    # Advance the sync mark to the newest conversation, but no further than the oldest one that
+    # failed or wasn't finished, so that one is fetched again next time. Conversations that keep
+    # failing are given up on once they are older than the retry window.
+    pending_start_times = [
+        start for (_, start), (_, done) in zip(new_conversations, fetched)
+        if not done and start is not None
+    ]
+    if pending_start_times:
+        next_start_time = max(min(pending_start_times), now - PENDING_RETRY_DAYS * 24 * 60 * 60)
+    else:
+        next_start_time = max((start for _, start in new_conversations if start is not None), default=last_start_time)
+    
+    with closing(_connect()) as conn, conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO call_sid_index (twilio_call_sid, conversation_id, fetched_at) VALUES (?, ?, ?)",
+            rows
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_start_time', ?)",
+            (max(next_start_time, last_start_time),)
+        )
+    
+    return len(rows)
@@ -3,12 +3,28 @@ import smtplib
 import logging
 import requests
 import base64
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from socket import timeout
 
 logger = logging.getLogger(__name__)
 
+# Reuse HTTPS connections to Google across sends
+_session = requests.Session()
+
+# Gmail OAuth access token, cached until shortly before it expires
+_gmail_token_lock = threading.Lock()
+_gmail_access_token = None
+_gmail_token_expiry = 0.0
+
+# SMTP connection kept open between sends and closed once it has been idle for a while
+SMTP_IDLE_TIMEOUT_SECONDS = 60
+_smtp_lock = threading.Lock()
+_smtp_connection = None
+_smtp_last_used = 0.0
+
 def send_email(to_email, subject, body):
     """
     Send an email using Gmail API, SendGrid API, or SMTP (in that order).
@@ -49,28 +65,50 @@ def send_email(to_email, subject, body):
         raise Exception(f"All email methods failed. Last error: {str(e)}")
 
 
+def get_gmail_access_token(client_id, client_secret, refresh_token):
+    """Get a Gmail API access token, reusing the cached one until it is about to expire"""
+    global _gmail_access_token, _gmail_token_expiry
+    
+    with _gmail_token_lock:
+        if _gmail_access_token and time.monotonic() < _gmail_token_expiry:
+            return _gmail_access_token
+        
+        token_url = "https://oauth2.googleapis.com/token"
+        token_data = {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "refresh_token": refresh_token,
+            "grant_type": "refresh_token"
+        }
+        
+        logger.info("Gmail API: Getting access token")
+        token_response = _session.post(token_url, data=token_data, timeout=10)
+        
+        if token_response.status_code != 200:
+            error_msg = f"Gmail API token error: {token_response.status_code} - {token_response.text}"
+            logger.error(error_msg)
+            raise Exception(error_msg)
+        
+        token_json = token_response.json()
+        _gmail_access_token = token_json["access_token"]
+        # Refresh a minute early so a token never expires mid-send
+        _gmail_token_expiry = time.monotonic() + int(token_json.get("expires_in", 3600)) - 60
+        return _gmail_access_token
+
+
+def invalidate_gmail_access_token():
+    """Drop the cached Gmail access token so the next send fetches a new one"""
+    global _gmail_access_token, _gmail_token_expiry
+    with _gmail_token_lock:
+        _gmail_access_token = None
+        _gmail_token_expiry = 0.0
+
+
 def send_email_gmail_api(to_email, subject, body, client_id, client_secret, refresh_token, user_email):
     """Send an email using Gmail API (free, works on Render.com via HTTPS)"""
     logger.info(f"Gmail API: Sending email from {user_email} to {to_email}")
     
-    # First, get an access token using the refresh token
-    token_url = "https://oauth2.googleapis.com/token"
-    token_data = {
-        "client_id": client_id,
-        "client_secret": client_secret,
-        "refresh_token": refresh_token,
-        "grant_type": "refresh_token"
-    }
-    
-    logger.info("Gmail API: Getting access token")
-    token_response = requests.post(token_url, data=token_data, timeout=10)
-    
-    if token_response.status_code != 200:
-        error_msg = f"Gmail API token error: {token_response.status_code} - {token_response.text}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
-    
-    access_token = token_response.json()["access_token"]
+    access_token = get_gmail_access_token(client_id, client_secret, refresh_token)
     
     # Create the email message
     message = MIMEMultipart()
@@ -94,12 +132,15 @@ def send_email_gmail_api(to_email, subject, body, client_id, client_secret, refr
     }
     
     logger.info(f"Gmail API: Making API request to {api_url}")
-    response = requests.post(api_url, json=payload, headers=headers, timeout=10)
+    response = _session.post(api_url, json=payload, headers=headers, timeout=10)
     
     if response.status_code == 200:
         logger.info("Gmail API: Email sent successfully")
         return {'success': True}
     else:
+        if response.status_code == 401:
+            # Token was revoked or expired early - fetch a fresh one next time
+            invalidate_gmail_access_token()
         error_msg = f"Gmail API error: {response.status_code} - {response.text}"
         logger.error(error_msg)
         raise Exception(error_msg)
@@ -148,6 +189,8 @@ def send_email_sendgrid(to_email, subject, body, api_key, from_email=None):
 
 def send_email_smtp(to_email, subject, body):
     """Send an email using SMTP (for local development)"""
+    global _smtp_last_used
+    
     # Get SMTP configuration from environment variables
     smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
     smtp_port = int(os.getenv('SMTP_PORT', '587'))
@@ -167,7 +210,38 @@ def send_email_smtp(to_email, subject, body):
     msg['Subject'] = subject
     msg.attach(MIMEText(body, 'plain'))
     
-    # Connect to SMTP server and send email with timeout
+    with _smtp_lock:
+        server = _get_smtp_connection(smtp_server, smtp_port, smtp_username, smtp_password)
+        try:
+            logger.info("Sending email message")
+            server.send_message(msg)
+            logger.info("Email sent successfully")
+        except Exception:
+            # Don't reuse a connection in an unknown state
+            _close_smtp_connection()
+            raise
+        
+        _smtp_last_used = time.monotonic()
+        return {'success': True}
+
+
+def _get_smtp_connection(smtp_server, smtp_port, smtp_username, smtp_password):
+    """
+    Return a logged-in SMTP connection, reusing the open one if it is recent and still alive.
+    Must be called with _smtp_lock held.
+    """
+    global _smtp_connection
+    
+    if _smtp_connection is not None:
+        if time.monotonic() - _smtp_last_used < SMTP_IDLE_TIMEOUT_SECONDS:
+            try:
+                _smtp_connection.noop()
+                return _smtp_connection
+            except (smtplib.SMTPException, OSError):
+                logger.info("SMTP connection dropped, reconnecting")
+        _close_smtp_connection()
+    
+    # Connect to SMTP server with timeout
     logger.info(f"Connecting to SMTP server {smtp_server}:{smtp_port}")
     server = smtplib.SMTP(smtp_server, smtp_port, timeout=10)
     
@@ -177,13 +251,23 @@ def send_email_smtp(to_email, subject, body):
         
         logger.info("Logging in to SMTP server")
         server.login(smtp_username, smtp_password)
-        
-        logger.info("Sending email message")
-        server.send_message(msg)
-        logger.info("Email sent successfully")
-        
-        return {'success': True}
-    finally:
-        logger.info("Closing SMTP connection")
-        server.quit()
+    except Exception:
+        server.close()
+        raise
+    
+    _smtp_connection = server
+    return server
+
 
+def _close_smtp_connection():
+    """Close the reusable SMTP connection. Must be called with _smtp_lock held."""
+    global _smtp_connection
+    if _smtp_connection is None:
+        return
+    
+    logger.info("Closing SMTP connection")
+    try:
+        _smtp_connection.quit()
+    except (smtplib.SMTPException, OSError):
+        _smtp_connection.close()
+    _smtp_connection = None
@@ -0,0 +1,45 @@
+"""
+Phone number helpers shared by the backend scripts.
+"""
+import re
+
+# Everything except digits and '+', for input that isn't plain ASCII
+_PHONE_CLEAN_RE = re.compile(r'[^\d+]')
+
+# ASCII bytes that aren't digits or '+', deleted in one bytes.translate pass
+_PHONE_DELETE_BYTES = bytes(b for b in range(128) if chr(b) not in '0123456789+')
+
+
+def format_phone_number(phone: str) -> str:
+    """Format phone number to E.164 format."""
+    if not phone.isascii():
+        return _format_unicode_phone_number(phone)
+    
+    # Remove all non-digit characters except +, working on ASCII bytes throughout
+    cleaned = phone.encode('ascii').translate(None, _PHONE_DELETE_BYTES)
+    
+    # If it doesn't start with +, assume US number and add +1
+    if not cleaned.startswith(b'+'):
+        if len(cleaned) == 10:
+            cleaned = b'+1' + cleaned
+        elif len(cleaned) == 11 and cleaned[0] == 0x31:  # '1'
+            cleaned = b'+' + cleaned
+        else:
+            cleaned = b'+1' + cleaned
+    
+    return cleaned.decode('ascii')
+
+
+def _format_unicode_phone_number(phone: str) -> str:
+    """format_phone_number for non-ASCII input, where the regex also keeps non-ASCII digits."""
+    cleaned = _PHONE_CLEAN_RE.sub('', phone)
+    
+    if not cleaned.startswith('+'):
+        if len(cleaned) == 10:
+            cleaned = '+1' + cleaned
+        elif len(cleaned) == 11 and cleaned[0] == '1':
+            cleaned = '+' + cleaned
+        else:
+            cleaned = '+1' + cleaned
+    
+    return cleaned
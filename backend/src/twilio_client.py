@@ -2,12 +2,26 @@
 Twilio client for making phone calls and sending SMS messages.
 """
 import os
+import threading
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
 from twilio.rest import Client
 from twilio.twiml.voice_response import VoiceResponse
 from dotenv import load_dotenv
+from urllib3.util.retry import Retry
 
 load_dotenv()
 
+# Connection pool for the Twilio REST session, sized for the concurrent lookups in app.py
+HTTP_POOL_CONNECTIONS = 32
+HTTP_POOL_MAXSIZE = 64
+
+# Calls in a final state don't change, so fetched call records are cached for a day by SID
+FINAL_CALL_STATUSES = ('completed', 'busy', 'failed', 'no-answer', 'canceled')
+_call_cache = TTLCache(maxsize=5000, ttl=24 * 60 * 60)
+_call_cache_lock = threading.Lock()
+
 
 class TwilioClient:
     """Client for interacting with Twilio API."""
@@ -29,7 +43,19 @@ class TwilioClient:
                 "Twilio credentials are required. Set TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN environment variables."
             )
         
-        self.client = Client(self.account_sid, self.auth_token)
+        self.client = Client(self.account_sid, self.auth_token, http_client=self._create_http_client())
+    
+    @staticmethod
+    def _create_http_client() -> TwilioHttpClient:
+        """Create a Twilio HTTP client whose session keeps a large pool of connections alive."""
+        http_client = TwilioHttpClient(pool_connections=True)
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=Retry(total=2, backoff_factor=0.1)
+        )
+        http_client.session.mount('https://', adapter)
+        return http_client
     
     def send_sms(self, to: str, body: str, from_number: str = None) -> dict:
         """
@@ -108,6 +134,27 @@ class TwilioClient:
             "from": call_from
         }
     
+    def fetch_call(self, call_sid: str):
+        """
+        Fetch a call record, served from the cache for calls that have already ended.
+        
+        Args:
+            call_sid: Twilio Call SID
+            
+        Returns:
+            Call instance from Twilio
+        """
+        with _call_cache_lock:
+            cached = _call_cache.get(call_sid)
+        if cached is not None:
+            return cached
+        
+        call = self.client.calls(call_sid).fetch()
+        if call.status in FINAL_CALL_STATUSES:
+            with _call_cache_lock:
+                _call_cache[call_sid] = call
+        return call
+    
     def create_voice_response(self, text: str, voice: str = "alice", language: str = "en-US") -> str:
         """
         Create TwiML for a voice call.
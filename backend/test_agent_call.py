@@ -3,13 +3,13 @@ Test script to initiate a phone call through ElevenLabs agent.
 """
 import os
 import sys
-import re
 import argparse
 import time
 from dotenv import load_dotenv
 from src.elevenlabs_client import ElevenLabsClient
 from src.twilio_client import TwilioClient
 from src.db import get_db_connection
+from src.phone_utils import format_phone_number
 
 load_dotenv()
 
@@ -17,23 +17,6 @@ load_dotenv()
 AGENT_ID = "agent_5201k8s317vffxfb14sd7zspmd9g"
 
 
-def format_phone_number(phone: str) -> str:
-    """Format phone number to E.164 format."""
-    # Remove all non-digit characters except +
-    cleaned = re.sub(r'[^\d+]', '', phone)
-    
-    # If it doesn't start with +, assume US number and add +1
-    if not cleaned.startswith('+'):
-        if len(cleaned) == 10:
-            cleaned = '+1' + cleaned
-        elif len(cleaned) == 11 and cleaned[0] == '1':
-            cleaned = '+' + cleaned
-        else:
-            cleaned = '+1' + cleaned
-    
-    return cleaned
-
-
 def get_approved_users() -> list:
     """Query database for all users with approved status 'APPROVED' and phone numbers."""
     approved_users = []